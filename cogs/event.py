@@ -1,12 +1,24 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-from utils.funcs import ReadJSON, log_to_discord
-from utils.constants import TIMEZONE_MAP
-from datetime import datetime
+from utils.funcs import log_to_discord, CheckIfAdminRole
+from utils.team_index import team_index
+from utils.event_store import event_store
+from utils.coalesce import RefreshCoalescer
+from utils.constants import TIMEZONE_MAP, EMBED_REFRESH_SECONDS, ARCHIVE_AFTER_DAYS
+from utils.reminders import ReminderScheduler, REMINDER_OFFSETS, reminder_needed
+from utils.dispatcher import Dispatcher
+from utils.event_index import UpcomingEventIndex
+from utils.log_pipeline import pack_lines
+from utils.storage import event_start, is_archive_month
+from utils.rsvp_render import RosterRenderer, mention
+from utils.export import iter_guild_events, csv_rows, iter_csv, ics_lines, iter_ics, spool
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+import asyncio
+import functools
+import math
 import pytz
-import os
-import json
 
 ATTEND_EMOJI = "✅"
 MAYBE_EMOJI = "🤔"
@@ -15,101 +27,474 @@ CANT_EMOJI = "❌"
 def get_pytz_timezone(friendly_name):
     return pytz.timezone(TIMEZONE_MAP.get(friendly_name, "UTC"))
 
-class EventRSVPView(discord.ui.View):
-    def __init__(self, event_cog, message_id):
-        super().__init__(timeout=None)
+REMOVE_EMOJI = "🚫"
+ROSTER_EMOJI = "📋"
+
+# custom_id action -> button label, style and emoji
+RSVP_BUTTONS = {
+    "attend": ("Can Attend", discord.ButtonStyle.success, ATTEND_EMOJI),
+    "maybe": ("May be able to", discord.ButtonStyle.secondary, MAYBE_EMOJI),
+    "cant": ("Can't Attend", discord.ButtonStyle.danger, CANT_EMOJI),
+    "remove": ("Remove Attendance", discord.ButtonStyle.danger, REMOVE_EMOJI),
+    "roster": ("Full Roster", discord.ButtonStyle.secondary, ROSTER_EMOJI)
+}
+
+class EventRSVPButton(discord.ui.DynamicItem[discord.ui.Button], template=r"event_rsvp:(?P<action>attend|maybe|cant|remove|roster)"):
+    """One RSVP button, routed by its custom_id.
+
+    The class is registered once with ``bot.add_dynamic_items`` and rebuilds
+    the button from the custom_id of whatever is clicked. The event is the
+    message the button is on, so no per-event view is kept in memory and
+    buttons keep working across restarts.
+    """
+
+    def __init__(self, action):
+        label, style, emoji = RSVP_BUTTONS[action]
+        super().__init__(discord.ui.Button(label=label, style=style, emoji=emoji, custom_id=f"event_rsvp:{action}"))
+        self.action = action
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["action"])
+
+    async def callback(self, interaction: discord.Interaction):
+        event_cog = interaction.client.get_cog("EventCog")
+        if self.action == "remove":
+            await event_cog.handle_remove_attendance(interaction, interaction.message.id)
+        elif self.action == "roster":
+            await event_cog.show_roster(interaction, interaction.message.id)
+        else:
+            await event_cog.handle_rsvp(interaction, interaction.message.id, RSVP_BUTTONS[self.action][2])
+
+def build_rsvp_view():
+    view = discord.ui.View(timeout=None)
+    for action in RSVP_BUTTONS:
+        view.add_item(EventRSVPButton(action))
+    return view
+
+MENTIONS_PER_LINE = 25
+EVENT_GONE = "This event is no longer active."
+
+RSVP_STATUSES = {
+    ATTEND_EMOJI: ("attend", "Can Attend", "Can Attend"),
+    MAYBE_EMOJI: ("maybe", "May be able to", "Maybe"),
+    CANT_EMOJI: ("cant", "Can't Attend", "Can't Attend")
+}
+
+class RosterView(discord.ui.View):
+    """Ephemeral, paginated view of every RSVP list for one event.
+
+    The event embed only shows what fits in its fields; this pages through
+    the full lists. A page is sliced from the live sets when it is shown, so
+    it never copies the whole roster.
+    """
+
+    def __init__(self, state, status="attend", per_page=40):
+        super().__init__(timeout=180)
+        self.state = state
+        self.status = status
+        self.per_page = per_page
+        self.page = 0
+
+        self.status_select = discord.ui.Select(
+            options=[
+                discord.SelectOption(label=label, value=key, emoji=emoji)
+                for emoji, (key, label, _) in RSVP_STATUSES.items()
+            ],
+            row=0
+        )
+        self.status_select.callback = self.select_status
+        self.prev_button = discord.ui.Button(label="Previous", style=discord.ButtonStyle.secondary, row=1)
+        self.next_button = discord.ui.Button(label="Next", style=discord.ButtonStyle.secondary, row=1)
+        self.prev_button.callback = self.prev_page
+        self.next_button.callback = self.next_page
+        self.add_item(self.status_select)
+        self.add_item(self.prev_button)
+        self.add_item(self.next_button)
+
+    def get_embed(self):
+        members = self.state.members[self.status]
+        max_page = max(0, math.ceil(len(members) / self.per_page) - 1)
+        # The list can shrink while the view is open
+        self.page = min(self.page, max_page)
+        self.prev_button.disabled = self.page == 0
+        self.next_button.disabled = self.page >= max_page
+        for option in self.status_select.options:
+            option.default = option.value == self.status
+
+        start = self.page * self.per_page
+        mentions = [mention(uid) for uid in islice(members, start, start + self.per_page)]
+        label = next(label for key, label, _ in RSVP_STATUSES.values() if key == self.status)
+        embed = discord.Embed(
+            title=f"{self.state.get('event_name', 'Event')}: {label} ({len(members)})",
+            description="\n".join(mentions) if mentions else "No one yet",
+            color=discord.Color.purple()
+        )
+        embed.set_footer(text=f"Page {self.page + 1} of {max_page + 1}")
+        return embed
+
+    async def select_status(self, interaction: discord.Interaction):
+        self.status = self.status_select.values[0]
+        self.page = 0
+        await interaction.response.edit_message(embed=self.get_embed(), view=self)
+
+    async def prev_page(self, interaction: discord.Interaction):
+        if self.page > 0:
+            self.page -= 1
+        await interaction.response.edit_message(embed=self.get_embed(), view=self)
+
+    async def next_page(self, interaction: discord.Interaction):
+        self.page += 1
+        await interaction.response.edit_message(embed=self.get_embed(), view=self)
+
+class UpcomingEventsView(discord.ui.View):
+    def __init__(self, event_cog, guild_id, team_name=None, per_page=5):
+        super().__init__(timeout=120)
         self.event_cog = event_cog
-        self.message_id = message_id
-
-    @discord.ui.button(label="Can Attend", style=discord.ButtonStyle.success, emoji=ATTEND_EMOJI)
-    async def can_attend(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.event_cog.handle_rsvp(interaction, self.message_id, ATTEND_EMOJI)
-
-    @discord.ui.button(label="May be able to", style=discord.ButtonStyle.secondary, emoji=MAYBE_EMOJI)
-    async def maybe_attend(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.event_cog.handle_rsvp(interaction, self.message_id, MAYBE_EMOJI)
-
-    @discord.ui.button(label="Can't Attend", style=discord.ButtonStyle.danger, emoji=CANT_EMOJI)
-    async def cant_attend(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.event_cog.handle_rsvp(interaction, self.message_id, CANT_EMOJI)
+        self.guild_id = guild_id
+        self.team_name = team_name
+        self.per_page = per_page
+        self.page = 0
+        self.total = 0
+
+        self.prev_button = discord.ui.Button(label="Previous", style=discord.ButtonStyle.secondary)
+        self.next_button = discord.ui.Button(label="Next", style=discord.ButtonStyle.secondary)
+        self.prev_button.callback = self.prev_page
+        self.next_button.callback = self.next_page
+        self.add_item(self.prev_button)
+        self.add_item(self.next_button)
+
+    def get_embed(self):
+        states, self.total = self.event_cog.upcoming.page(
+            self.guild_id, datetime.now(timezone.utc), self.team_name, self.page, self.per_page
+        )
+        max_page = max(0, math.ceil(self.total / self.per_page) - 1)
+        self.prev_button.disabled = self.page == 0
+        self.next_button.disabled = self.page >= max_page
 
-    @discord.ui.button(label="Remove Attendance", style=discord.ButtonStyle.danger, emoji="🚫")
-    async def remove_attendance(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.event_cog.handle_remove_attendance(interaction, self.message_id)
+        embed = discord.Embed(
+            title=f"Upcoming Events{f' for {self.team_name}' if self.team_name else ''}",
+            description=f"Total Upcoming: {self.total}" if self.total else "No upcoming events.",
+            color=discord.Color.purple()
+        )
+        for state in states:
+            unix_time = int(state.start.timestamp())
+            channel_id = state.get("channel_id")
+            link = f"\n[Jump to event](https://discord.com/channels/{state.guild_id}/{channel_id}/{state.message_id})" if channel_id else ""
+            embed.add_field(
+                name=state.get("event_name", "Event"),
+                value=(
+                    f"Team: {state.get('team_name', 'Unknown')}\n"
+                    f"When: <t:{unix_time}:F> (<t:{unix_time}:R>)\n"
+                    f"{ATTEND_EMOJI} {len(state.members['attend'])}  {MAYBE_EMOJI} {len(state.members['maybe'])}  {CANT_EMOJI} {len(state.members['cant'])}"
+                    f"{link}"
+                ),
+                inline=False
+            )
+        embed.set_footer(text=f"Page {self.page + 1} of {max_page + 1}")
+        return embed
+
+    async def prev_page(self, interaction: discord.Interaction):
+        if self.page > 0:
+            self.page -= 1
+        await interaction.response.edit_message(embed=self.get_embed(), view=self)
+
+    async def next_page(self, interaction: discord.Interaction):
+        self.page += 1
+        embed = self.get_embed()
+        if self.page * self.per_page >= self.total and self.page > 0:
+            # Events started since the last page; step back to the real last page
+            self.page = max(0, math.ceil(self.total / self.per_page) - 1)
+            embed = self.get_embed()
+        await interaction.response.edit_message(embed=embed, view=self)
 
 class EventCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.events_folder = 'data/events'
-        os.makedirs(self.events_folder, exist_ok=True)
-
-    def get_events_file(self, guild_id):
-        return os.path.join(self.events_folder, f"{guild_id}.json")
-
-    def load_events(self, guild_id):
-        file_path = self.get_events_file(guild_id)
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        return {}
-
-    def save_events(self, guild_id, events):
-        file_path = self.get_events_file(guild_id)
-        with open(file_path, 'w') as f:
-            json.dump(events, f, indent=4)
+        self.events = event_store
+        self.embed_refresh = RefreshCoalescer(EMBED_REFRESH_SECONDS)
+        self.reminders = ReminderScheduler(self.send_reminders)
+        self.reminder_task = None
+        self.reattach_task = None
+        self.dispatcher = Dispatcher()
+        self.upcoming = UpcomingEventIndex()
+        self.rosters = {}
+        self.events.add_listener(self.reminders.plan)
+        self.events.add_listener(self.upcoming.add)
+        self.events.add_remove_listener(self.upcoming.remove)
+        self.events.add_remove_listener(self.reminders.forget)
+        self.events.add_remove_listener(self.drop_roster)
+
+    async def cog_load(self):
+        self.bot.add_dynamic_items(EventRSVPButton)
+        self.compact_journals.start()
+        self.archive_events.start()
+        self.reminder_task = asyncio.create_task(self.run_reminders())
+
+    async def cog_unload(self):
+        self.compact_journals.cancel()
+        self.archive_events.cancel()
+        if self.reminder_task:
+            self.reminder_task.cancel()
+        if self.reattach_task:
+            self.reattach_task.cancel()
+        self.bot.remove_dynamic_items(EventRSVPButton)
+        await self.embed_refresh.flush()
+        self.events.flush_sync()
+        self.events.compact_all()
+
+    @tasks.loop(minutes=5)
+    async def compact_journals(self):
+        await self.events.flush()
+        await asyncio.to_thread(self.events.compact_all)
 
     async def handle_rsvp(self, interaction, message_id, emoji):
         guild_id = str(interaction.guild_id)
-        events = self.load_events(guild_id)
-        event_data = events.get(str(message_id), {})
-        for key in ["attend", "maybe", "cant"]:
-            if key not in event_data:
-                event_data[key] = []
-
-        # Remove user from all lists first
-        for key in ["attend", "maybe", "cant"]:
-            if interaction.user.id in event_data[key]:
-                event_data[key].remove(interaction.user.id)
-
-        # Add user to the selected list
-        if emoji == ATTEND_EMOJI:
-            event_data["attend"].append(interaction.user.id)
-            await log_to_discord(self.bot, guild_id, f"{interaction.user} ({interaction.user.id}) RSVP'd as Can Attend for event {event_data.get('event_name', '')}")
-            await interaction.response.send_message("You've RSVP'd as **Can Attend**.", ephemeral=True)
-        elif emoji == MAYBE_EMOJI:
-            event_data["maybe"].append(interaction.user.id)
-            await log_to_discord(self.bot, guild_id, f"{interaction.user} ({interaction.user.id}) RSVP'd as Maybe for event {event_data.get('event_name', '')}")
-            await interaction.response.send_message("You've RSVP'd as **May be able to**.", ephemeral=True)
-        elif emoji == CANT_EMOJI:
-            event_data["cant"].append(interaction.user.id)
-            await log_to_discord(self.bot, guild_id, f"{interaction.user} ({interaction.user.id}) RSVP'd as Can't Attend for event {event_data.get('event_name', '')}")
-            await interaction.response.send_message("You've RSVP'd as **Can't Attend**.", ephemeral=True)
-
-        events[str(message_id)] = event_data
-        self.save_events(guild_id, events)
-        await self.update_embed(interaction.message, event_data)
-
-    async def update_embed(self, message, event_data):
+        status, label, log_label = RSVP_STATUSES[emoji]
+        # Memory only; the backend write, log and embed refresh all happen after the reply
+        state, previous = self.events.rsvp(guild_id, message_id, interaction.user.id, status)
+        if state is None:
+            await interaction.response.send_message(EVENT_GONE, ephemeral=True)
+            return
+        self.track_rsvp(state, interaction.user.id, previous, status)
+        await interaction.response.send_message(f"You've RSVP'd as **{label}**.", ephemeral=True)
+
+        await log_to_discord(self.bot, guild_id, f"{interaction.user} ({interaction.user.id}) RSVP'd as {log_label} for event {state.get('event_name', '')}")
+        self.refresh_embed(interaction.message, state)
+
+    @tasks.loop(hours=6)
+    async def archive_events(self):
+        # Keeps the live per-guild files to recent events only
+        before = datetime.now(timezone.utc) - timedelta(days=ARCHIVE_AFTER_DAYS)
+        count = await self.events.archive_past(before)
+        if count:
+            print(f"Archived {count} past event(s)")
+
+    async def run_reminders(self):
+        await self.bot.wait_until_ready()
+        # Past events never enter the indexes, so startup cost follows upcoming events only
+        upcoming = await self.events.load_upcoming(datetime.now(timezone.utc))
+        self.upcoming.add_all(upcoming)
+        self.reminders.plan_all(upcoming)
+        self.reattach_task = asyncio.create_task(self.reattach_views(upcoming))
+        await self.reminders.run()
+
+    async def reattach_views(self, upcoming):
+        """Swap the buttons on older upcoming events for the dynamic RSVP buttons.
+
+        Events posted before the buttons were routed by custom_id carry
+        per-message custom_ids that nothing listens for any more. Each such
+        message is edited once and marked, so later restarts skip it.
+        """
+        sends, marked = [], []
+        for state in upcoming:
+            if state.get("dynamic_buttons"):
+                continue
+            channel = self.get_event_channel(state)
+            if not channel:
+                continue
+            message = channel.get_partial_message(int(state.message_id))
+            sends.append((channel.id, functools.partial(self.reattach_view, message, state, marked)))
+        await self.dispatcher.dispatch("RSVP buttons", sends)
+        for state in marked:
+            await self.events.update(state, dynamic_buttons=True)
+
+    async def reattach_view(self, message, state, marked):
+        try:
+            await message.edit(view=build_rsvp_view())
+        except discord.NotFound:
+            # The message is gone; nothing left to fix
+            pass
+        marked.append(state)
+
+    def get_event_channel(self, state):
+        channel_id = state.get("channel_id")
+        if not channel_id:
+            # Events from before channel_id was stored were posted in their team's schedule channel
+            team = team_index.find(state.guild_id, state.get("team_name", ""))
+            channel_id = team.get("team_schedule_channel") if team else None
+        return self.bot.get_channel(int(channel_id)) if channel_id else None
+
+    async def send_reminders(self, due):
+        """Reminder callback: post every reminder due this minute, one batch per channel."""
+        now = datetime.now(timezone.utc)
+        by_channel = {}
+        for state, key in due:
+            if self.events.get(state.guild_id, state.message_id) is not state:
+                continue
+            if not reminder_needed(state, key) or not state.start or state.start <= now:
+                continue
+            channel = self.get_event_channel(state)
+            if not channel:
+                continue
+            reminders = by_channel.setdefault(channel.id, (channel, {}))[1]
+            # The same event can be queued twice after a re-plan; keep the later reminder
+            if state not in reminders or REMINDER_OFFSETS[key] < REMINDER_OFFSETS[reminders[state]]:
+                reminders[state] = key
+        sends = [
+            (channel_id, functools.partial(self.send_channel_reminders, channel, reminders))
+            for channel_id, (channel, reminders) in by_channel.items()
+        ]
+        await self.dispatcher.dispatch("event reminders", sends)
+
+    async def send_channel_reminders(self, channel, reminders):
+        lines = []
+        for state in reminders:
+            unix_time = int(state.start.timestamp())
+            lines.append(f"⏰ **{state.get('event_name', 'Event')}** ({state.get('team_name', '')}) starts <t:{unix_time}:R> (<t:{unix_time}:F>)")
+            mentions = [f"<@{uid}>" for key in ("attend", "maybe") for uid in state.members[key]]
+            if not mentions:
+                lines.append("No one has RSVP'd yet.")
+            for start in range(0, len(mentions), MENTIONS_PER_LINE):
+                lines.append(" ".join(mentions[start:start + MENTIONS_PER_LINE]))
+        for content in pack_lines(lines):
+            await channel.send(content, allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False))
+        for state, key in reminders.items():
+            await self.events.update(state, reminders_sent=state.get("reminders_sent", []) + [key])
+
+    def roster(self, state):
+        """Return the event's rendered RSVP fields, building them on first use."""
+        key = (state.guild_id, state.message_id)
+        renderer = self.rosters.get(key)
+        if renderer is None or renderer.state is not state:
+            renderer = self.rosters[key] = RosterRenderer(state)
+        return renderer
+
+    def track_rsvp(self, state, user_id, previous, status):
+        # Not built yet means the first render reads the state as it is by then
+        renderer = self.rosters.get((state.guild_id, state.message_id))
+        if renderer is not None and renderer.state is state:
+            renderer.apply(state, user_id, previous, status)
+
+    def drop_roster(self, state):
+        self.rosters.pop((state.guild_id, state.message_id), None)
+
+    def refresh_embed(self, message, state):
+        # Bursts of clicks on one event become at most one edit per window
+        self.embed_refresh.mark(state.message_id, functools.partial(self.update_embed, message, state))
+
+    async def update_embed(self, message, state):
+        # Field values are kept rendered and truncated as RSVPs come in, so
+        # this only reads them; the full lists are behind the Full Roster button
         embed = message.embeds[0]
-        attend_list = [f"<@{uid}>" for uid in event_data.get("attend", [])]
-        maybe_list = [f"<@{uid}>" for uid in event_data.get("maybe", [])]
-        cant_list = [f"<@{uid}>" for uid in event_data.get("cant", [])]
+        roster = self.roster(state)
+        for i, (emoji, (key, label, _)) in enumerate(RSVP_STATUSES.items()):
+            embed.set_field_at(i, name=f"{label} {emoji} ({len(state.members[key])})", value=roster.value(key), inline=False)
 
-        embed.set_field_at(0, name=f"Can Attend {ATTEND_EMOJI} ({len(attend_list)})", value="\n".join(attend_list) if attend_list else "No one yet", inline=False)
-        embed.set_field_at(1, name=f"May be able to {MAYBE_EMOJI} ({len(maybe_list)})", value="\n".join(maybe_list) if maybe_list else "No one yet", inline=False)
-        embed.set_field_at(2, name=f"Can't Attend {CANT_EMOJI} ({len(cant_list)})", value="\n".join(cant_list) if cant_list else "No one yet", inline=False)
-
-        await message.edit(embed=embed)
+        try:
+            # Passing the view also gives older events the Full Roster button
+            await message.edit(embed=embed, view=build_rsvp_view())
+        except discord.HTTPException as e:
+            print(f"Failed to refresh event embed {message.id}: {e}")
 
     async def team_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=team_name, value=team_name)
+            for team_name in team_index.search(interaction.guild_id, current)
+        ]
+
+    @app_commands.command(name="upcoming_events", description="List upcoming events, soonest first.")
+    @app_commands.describe(team_name="Only show this team's events (optional).")
+    @app_commands.autocomplete(team_name=team_autocomplete)
+    async def upcoming_events(self, interaction: discord.Interaction, team_name: str = None):
         guild_id = str(interaction.guild_id)
-        teams = ReadJSON("data/servers.json").get(guild_id, {}).get("teams", [])
+        if team_name:
+            team = team_index.find(guild_id, team_name)
+            if not team:
+                await interaction.response.send_message("Team not found.", ephemeral=True)
+                return
+            team_name = team["team_name"]
+        view = UpcomingEventsView(self, guild_id, team_name)
+        await log_to_discord(self.bot, guild_id, f"upcoming_events used by {interaction.user} ({interaction.user.id})")
+        await interaction.response.send_message(embed=view.get_embed(), view=view, ephemeral=True)
+
+    async def archive_month_autocomplete(self, interaction: discord.Interaction, current: str):
+        months = self.events.archived_months(interaction.guild_id)
         return [
-            app_commands.Choice(name=team["team_name"], value=team["team_name"])
-            for team in teams
-            if current.lower() in team["team_name"].lower()
+            app_commands.Choice(name=month, value=month)
+            for month in reversed(months) if current in month
         ][:25]
 
+    @app_commands.command(name="event_history", description="Show attendance for archived past events.")
+    @app_commands.describe(month="The month to look at (YYYY-MM).", team_name="Only show this team's events (optional).")
+    @app_commands.autocomplete(month=archive_month_autocomplete, team_name=team_autocomplete)
+    async def event_history(self, interaction: discord.Interaction, month: str, team_name: str = None):
+        guild_id = str(interaction.guild_id)
+        if not is_archive_month(month):
+            await interaction.response.send_message("Invalid month. Please use the format YYYY-MM.", ephemeral=True)
+            return
+        events = self.events.archived_events(guild_id, month)
+        if team_name:
+            events = {
+                message_id: event_data for message_id, event_data in events.items()
+                if event_data.get("team_name", "").casefold() == team_name.casefold()
+            }
+        if not events:
+            await interaction.response.send_message(f"No archived events for {month}.", ephemeral=True)
+            return
+
+        ordered = sorted(events.values(), key=lambda event_data: event_data.get("datetime", ""))
+        embed = discord.Embed(
+            title=f"Event History: {month}{f' ({team_name})' if team_name else ''}",
+            description=f"Archived Events: {len(ordered)}",
+            color=discord.Color.purple()
+        )
+        for event_data in ordered[:25]:
+            start = event_start(event_data)
+            embed.add_field(
+                name=event_data.get("event_name", "Event"),
+                value=(
+                    f"Team: {event_data.get('team_name', 'Unknown')}\n"
+                    f"When: {f'<t:{int(start.timestamp())}:F>' if start else 'Unknown'}\n"
+                    f"{ATTEND_EMOJI} {len(event_data.get('attend', []))}  {MAYBE_EMOJI} {len(event_data.get('maybe', []))}  {CANT_EMOJI} {len(event_data.get('cant', []))}"
+                ),
+                inline=False
+            )
+        if len(ordered) > 25:
+            embed.set_footer(text=f"Showing the first 25 of {len(ordered)} events. Filter by team to narrow it down.")
+        await log_to_discord(self.bot, guild_id, f"event_history for {month} used by {interaction.user} ({interaction.user.id})")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="export_events", description="Export events and RSVPs as a CSV spreadsheet or an iCalendar file.")
+    @app_commands.describe(file_format="CSV of every RSVP, or an .ics calendar of the events.", team_name="Only export this team's events (optional).")
+    @app_commands.choices(file_format=[app_commands.Choice(name="CSV", value="csv"), app_commands.Choice(name="iCalendar", value="ics")])
+    @app_commands.autocomplete(team_name=team_autocomplete)
+    async def export_events(self, interaction: discord.Interaction, file_format: str, team_name: str = None):
+        guild_id = str(interaction.guild_id)
+        if not CheckIfAdminRole([role.id for role in interaction.user.roles], interaction.guild.id):
+            await log_to_discord(self.bot, guild_id, f"Unauthorized export_events attempt by {interaction.user} ({interaction.user.id})")
+            return await interaction.response.send_message(
+                "You do not have permission to use this command.",
+                ephemeral=True
+            )
+        if team_name:
+            team = team_index.find(guild_id, team_name)
+            if not team:
+                await interaction.response.send_message("Team not found.", ephemeral=True)
+                return
+            team_name = team["team_name"]
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        # Queued RSVPs go to the backend first so the export matches what members see
+        await self.events.flush()
+        # Copied on the loop; the export itself is written in a worker thread
+        live_events = self.events.live_events(guild_id)
+        events = iter_guild_events(self.events, guild_id, live_events, team_name)
+        if file_format == "ics":
+            chunks = iter_ics(ics_lines(events, f"{team_name or interaction.guild.name} Events"))
+        else:
+            chunks = iter_csv(csv_rows(events))
+        # Archives are read and the file written a chunk at a time, off the event loop
+        fp, size = await asyncio.to_thread(spool, chunks)
+
+        with fp:
+            if size > interaction.guild.filesize_limit:
+                await interaction.followup.send("The export is too large to upload. Filter by team to narrow it down.", ephemeral=True)
+                return
+            filename = f"{(team_name or 'events').replace(' ', '_')}.{file_format}"
+            await interaction.followup.send(file=discord.File(fp, filename=filename), ephemeral=True)
+        await log_to_discord(self.bot, guild_id, f"export_events ({file_format}) used by {interaction.user} ({interaction.user.id})")
+
     @app_commands.command(name="event", description="Create a team event with RSVP buttons.")
     @app_commands.describe(
         team_name="The team for the event.",
@@ -127,8 +512,7 @@ class EventCog(commands.Cog):
         event_name: str
     ):
         guild_id = str(interaction.guild_id)
-        teams = ReadJSON("data/servers.json").get(guild_id, {}).get("teams", [])
-        team = next((t for t in teams if t["team_name"].lower() == team_name.lower()), None)
+        team = team_index.find(guild_id, team_name)
         if not team:
             await log_to_discord(self.bot, guild_id, f"Event creation failed: team '{team_name}' not found by {interaction.user} ({interaction.user.id})")
             await interaction.response.send_message("Team not found.", ephemeral=True)
@@ -176,44 +560,44 @@ class EventCog(commands.Cog):
         embed.add_field(name=f"May be able to {MAYBE_EMOJI}", value="No one yet", inline=False)
         embed.add_field(name=f"Can't Attend {CANT_EMOJI}", value="No one yet", inline=False)
 
-        message_obj = await channel.send(content=team_role_mention, embed=embed, view=EventRSVPView(self, None))
-        await message_obj.edit(view=EventRSVPView(self, message_obj.id))
-        await log_to_discord(self.bot, guild_id, f"Event '{event_name}' created for team '{team_name}' by {interaction.user} ({interaction.user.id}) in channel {channel.mention}")
-        await interaction.response.send_message(f"Event created in {channel.mention}", ephemeral=True)
+        message_obj = await channel.send(content=team_role_mention, embed=embed, view=build_rsvp_view())
 
-        # Save event info under guild_id and message.id
-        events = self.load_events(guild_id)
+        # Saved before anything else is awaited, so the buttons work from the first click
         event_data = {
             "event_name": event_name,
-            "team_name": team_name,
+            "team_name": team["team_name"],
             "datetime": event_dt.isoformat(),
+            "channel_id": channel.id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "dynamic_buttons": True,
             "attend": [],
             "maybe": [],
             "cant": []
         }
-        events[str(message_obj.id)] = event_data
-        self.save_events(guild_id, events)
+        self.events.create(guild_id, message_obj.id, event_data)
+        await log_to_discord(self.bot, guild_id, f"Event '{event_name}' created for team '{team_name}' by {interaction.user} ({interaction.user.id}) in channel {channel.mention}")
+        await interaction.response.send_message(f"Event created in {channel.mention}", ephemeral=True)
+
+    async def show_roster(self, interaction, message_id):
+        state = self.events.get(interaction.guild_id, message_id)
+        if state is None:
+            await interaction.response.send_message(EVENT_GONE, ephemeral=True)
+            return
+        view = RosterView(state)
+        await interaction.response.send_message(embed=view.get_embed(), view=view, ephemeral=True)
 
     async def handle_remove_attendance(self, interaction, message_id):
         guild_id = str(interaction.guild_id)
-        events = self.load_events(guild_id)
-        event_data = events.get(str(message_id), {})
-        removed = False
-
-        for key in ["attend", "maybe", "cant"]:
-            if interaction.user.id in event_data.get(key, []):
-                event_data[key].remove(interaction.user.id)
-                removed = True
-
-        events[str(message_id)] = event_data
-        self.save_events(guild_id, events)
-        await self.update_embed(interaction.message, event_data)
-
-        if removed:
-            await log_to_discord(self.bot, guild_id, f"{interaction.user} ({interaction.user.id}) removed their attendance for event {event_data.get('event_name', '')}")
-            await interaction.response.send_message("Your attendance has been removed.", ephemeral=True)
-        else:
-            await log_to_discord(self.bot, guild_id, f"{interaction.user} ({interaction.user.id}) attempted to remove attendance but was not signed up for event {event_data.get('event_name', '')}")
+        state, previous = self.events.rsvp(guild_id, message_id, interaction.user.id, None)
+        if state is None:
+            await interaction.response.send_message(EVENT_GONE, ephemeral=True)
+            return
+        self.track_rsvp(state, interaction.user.id, previous, None)
+        if previous is None:
             await interaction.response.send_message("You were not signed up for this event.", ephemeral=True)
+            await log_to_discord(self.bot, guild_id, f"{interaction.user} ({interaction.user.id}) attempted to remove attendance but was not signed up for event {state.get('event_name', '')}")
+            return
 
-
+        await interaction.response.send_message("Your attendance has been removed.", ephemeral=True)
+        await log_to_discord(self.bot, guild_id, f"{interaction.user} ({interaction.user.id}) removed their attendance for event {state.get('event_name', '')}")
+        self.refresh_embed(interaction.message, state)
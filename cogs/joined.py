@@ -1,6 +1,6 @@
 import discord
 from discord.ext import commands
-from utils.funcs import WriteJSON, ReadJSON
+from utils.server_store import server_store
 
 class JoinedCog(commands.Cog):
     def __init__(self, bot):
@@ -8,13 +8,5 @@ class JoinedCog(commands.Cog):
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild):
-        filename = "data/servers.json"
-        try:
-            data = ReadJSON(filename)
-        except FileNotFoundError:
-            data = {}
-
         guild_id = str(guild.id)
-        data[guild_id] = {"SetupComplete": False}
-
-        WriteJSON(data, filename, indent=4)
\ No newline at end of file
+        server_store.set(guild_id, {"SetupComplete": False})
\ No newline at end of file
@@ -1,10 +1,21 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-from utils.funcs import WriteJSON, ReadJSON, CheckIfAdminRole, log_to_discord
-from datetime import datetime, timedelta
-import pytz
+from utils.funcs import CheckIfAdminRole, CheckIfTeamCaptain, log_to_discord
+from utils.server_store import server_store
+from utils.permissions import permission_index
+from utils.team_index import team_index, MAX_CHOICES
+from utils.locks import guild_lock
+from utils.scheduler import WeeklyScheduler, team_timezone, previous_fire_time
+from utils.job_queue import job_queue, PENDING, SENDING, SENT, EXPIRED, INTERRUPTED
+from utils.dispatcher import Dispatcher
+from utils.availability import availability_store, count_planes, plane_counts, slots_at_least, SLOTS_PER_DAY
+from utils.constants import REACTION_MODE, GRID_MODE, TIME_LABELS
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
 import asyncio
+import functools
+import pytz
 
 def get_previous_monday(dt):
     # If today is Monday, return today; else, return previous Monday
@@ -16,13 +27,13 @@ def get_number_emojis():
         "1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟"
     ]
 
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+NUMBER_EMOJI_SLOTS = {emoji: slot for slot, emoji in enumerate(get_number_emojis())}
+
 def build_intro_embed(team_role_mention, start_date):
     number_emojis = get_number_emojis()
-    time_labels = [
-        "1 PM", "2 PM", "3 PM", "4 PM", "5 PM", "6 PM", "7 PM", "8 PM",
-        "9 PM", "10 PM"
-    ]
-    times_str = "\n".join([f"{emoji} = {label}" for emoji, label in zip(number_emojis, time_labels)])
+    times_str = "\n".join([f"{emoji} = {label}" for emoji, label in zip(number_emojis, TIME_LABELS)])
     embed = discord.Embed(
         title="Weekly Scheduling",
         description=(
@@ -39,13 +50,39 @@ def build_intro_embed(team_role_mention, start_date):
     embed.set_footer(text="React to each day's message to indicate your availability.")
     return embed
 
+def build_grid_embed(team_role_mention, start_date):
+    days_str = "\n".join(
+        (start_date + timedelta(days=i)).strftime("%A: The %d of %B") for i in range(7)
+    )
+    embed = discord.Embed(
+        title="Weekly Scheduling",
+        description=(
+            f"{team_role_mention}\n"
+            f"**{start_date.strftime('%A: The %d of %B')}**\n\n"
+            "Scheduling for this week!\n"
+            "Pick a day from the menu below, then tick every time slot you're available for that day.\n"
+            f"Time slots run from **{TIME_LABELS[0]} to {TIME_LABELS[-1]}**.\n"
+            "You can come back and change your answers at any time.\n\n"
+            f"{days_str}\n"
+        ),
+        color=discord.Color.blue()
+    )
+    embed.set_footer(text="Only you can see your answers.")
+    return embed
+
+def get_team_role_mention(team):
+    team_role_id = team.get("team_role_id")
+    return f"<@&{team_role_id}>" if team_role_id else ""
+
 def build_day_message(date_str):
     return f"**{date_str}**"
 
-async def send_weekly_schedule_messages(channel, team_role_mention, start_date):
+async def send_weekly_schedule_messages(channel, team_role_mention, start_date, team_name, posted=None):
     # Send intro embed (with ping)
     embed = build_intro_embed(team_role_mention, start_date)
-    await channel.send(content=team_role_mention, embed=embed)
+    message = await channel.send(content=team_role_mention, embed=embed)
+    if posted is not None:
+        posted.append(message.id)
 
     number_emojis = get_number_emojis()
     # Send a message for each day (Monday to Sunday), no ping
@@ -54,23 +91,312 @@ async def send_weekly_schedule_messages(channel, team_role_mention, start_date):
         day_str = day_date.strftime("%A: The %d of %B")
         msg_content = build_day_message(day_str)
         message = await channel.send(msg_content)
+        if posted is not None:
+            posted.append(message.id)
+        # Index the message before reacting so early reactions are counted
+        availability_store.register_message(message.id, channel.guild.id, team_name, start_date.strftime("%Y-%m-%d"), day=i)
         for emoji in number_emojis:
             await message.add_reaction(emoji)
 
-def update_last_synced(servers, guild_id, team_idx, today_str):
-    current_server = servers.get(guild_id, {})
-    teams = current_server.get("teams", [])
-    teams[team_idx]["last_synced"] = today_str
-    current_server["teams"] = teams
-    servers[guild_id] = current_server
-    return servers
+async def send_weekly_schedule_grid(channel, team_role_mention, start_date, team_name):
+    # One message for the whole week; answers come back as interactions
+    embed = build_grid_embed(team_role_mention, start_date)
+    return await channel.send(content=team_role_mention, embed=embed, view=build_grid_view(team_name, start_date))
+
+async def send_team_schedule(channel, team, start_date, posted=None):
+    """Post a team's weekly schedule in the team's chosen schedule mode.
+
+    Args:
+        channel (discord.TextChannel): Where to post.
+        team (dict): The team config.
+        start_date (datetime): The Monday of the week.
+        posted (list, optional): Gets the ID of every message as soon as it is
+            posted, so a caller can tell a failed send from a partial one.
+    """
+    team_role_mention = get_team_role_mention(team)
+    if team.get("schedule_mode", REACTION_MODE) == GRID_MODE:
+        message = await send_weekly_schedule_grid(channel, team_role_mention, start_date, team["team_name"])
+        if posted is not None:
+            posted.append(message.id)
+        availability_store.register_message(message.id, channel.guild.id, team["team_name"], start_date.strftime("%Y-%m-%d"))
+    else:
+        await send_weekly_schedule_messages(channel, team_role_mention, start_date, team["team_name"], posted)
+
+def format_slots(slots):
+    return ", ".join(TIME_LABELS[slot] for slot in slots) if slots else "Not available"
+
+# Older grids were sent with the bare "schedule_grid:day" / "schedule_grid:mine"
+GRID_TEMPLATE = r"schedule_grid:{action}(?::(?P<week>\d{{4}}-\d{{2}}-\d{{2}}):(?P<team>.*))?"
+CUSTOM_ID_LIMIT = 100
+
+def grid_custom_id(action, team_name, week):
+    """Return the custom_id for a grid control, carrying its team and week when they fit."""
+    custom_id = f"schedule_grid:{action}:{week}:{team_name}"
+    # Very long team names fall back to the message index
+    return custom_id if len(custom_id) <= CUSTOM_ID_LIMIT else f"schedule_grid:{action}"
+
+async def grid_record(interaction, match):
+    """Return the ``guild_id``/``team_name``/``week`` a grid click is for, replying if it has none.
+
+    Grids carry their team and week in the custom_id; older ones, and ones for
+    very long team names, are looked up by message ID instead.
+    """
+    if match["week"]:
+        return {"guild_id": str(interaction.guild_id), "team_name": match["team"], "week": match["week"]}
+    record = availability_store.lookup_message(interaction.message.id)
+    if not record:
+        await interaction.response.send_message("This schedule is no longer active.", ephemeral=True)
+    return record
+
+class GridDaySelect(discord.ui.DynamicItem[discord.ui.Select], template=GRID_TEMPLATE.format(action="day")):
+    """The day picker on a grid schedule message.
+
+    Like the event RSVP buttons, the class is registered once with
+    ``bot.add_dynamic_items`` and rebuilt from the custom_id of whatever is
+    clicked, so no view is kept per grid message.
+    """
+
+    def __init__(self, custom_id, start_date=None):
+        options = [
+            discord.SelectOption(
+                label=(start_date + timedelta(days=i)).strftime("%A %d %B") if start_date else name,
+                value=str(i)
+            )
+            for i, name in enumerate(DAY_NAMES)
+        ]
+        super().__init__(discord.ui.Select(
+            placeholder="Pick a day to set your availability...",
+            min_values=1, max_values=1, options=options,
+            custom_id=custom_id
+        ), row=0)
+        self.match = self.template.fullmatch(custom_id)
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls(item.custom_id)
+
+    async def callback(self, interaction: discord.Interaction):
+        record = await grid_record(interaction, self.match)
+        if not record:
+            return
+        day = int(self.item.values[0])
+        current = availability_store.get_day(record["guild_id"], record["team_name"], record["week"], interaction.user.id, day)
+        await interaction.response.send_message(
+            f"**{DAY_NAMES[day]}** for **{record['team_name']}**: pick every slot you're available for.",
+            view=AvailabilitySlotView(record, day, current),
+            ephemeral=True
+        )
+
+class GridMineButton(discord.ui.DynamicItem[discord.ui.Button], template=GRID_TEMPLATE.format(action="mine")):
+    """The "My Availability" button on a grid schedule message."""
+
+    def __init__(self, custom_id):
+        super().__init__(discord.ui.Button(
+            label="My Availability", style=discord.ButtonStyle.secondary, custom_id=custom_id
+        ), row=1)
+        self.match = self.template.fullmatch(custom_id)
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(item.custom_id)
+
+    async def callback(self, interaction: discord.Interaction):
+        record = await grid_record(interaction, self.match)
+        if not record:
+            return
+        week = availability_store.get_week(record["guild_id"], record["team_name"], record["week"], interaction.user.id)
+        lines = [f"**{name}:** {format_slots(week.get(day, []))}" for day, name in enumerate(DAY_NAMES)]
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+def build_grid_view(team_name, start_date):
+    view = discord.ui.View(timeout=None)
+    week = start_date.strftime("%Y-%m-%d")
+    view.add_item(GridDaySelect(grid_custom_id("day", team_name, week), start_date))
+    view.add_item(GridMineButton(grid_custom_id("mine", team_name, week)))
+    return view
+
+class AvailabilitySlotView(discord.ui.View):
+    def __init__(self, record, day, current):
+        super().__init__(timeout=180)
+        self.record = record
+        self.day = day
+        options = [
+            discord.SelectOption(label=label, value=str(idx), default=idx in current)
+            for idx, label in enumerate(TIME_LABELS)
+        ]
+        self.slot_select = discord.ui.Select(
+            placeholder="Select the times you're available...",
+            min_values=0, max_values=len(options), options=options
+        )
+        self.slot_select.callback = self.save_slots
+        self.add_item(self.slot_select)
+
+    async def save_slots(self, interaction: discord.Interaction):
+        slots = [int(value) for value in self.slot_select.values]
+        record = self.record
+        availability_store.set_day(record["guild_id"], record["team_name"], record["week"], interaction.user.id, self.day, slots)
+        await interaction.response.edit_message(
+            content=f"Saved **{DAY_NAMES[self.day]}** for **{record['team_name']}**: {format_slots(sorted(slots))}",
+            view=None
+        )
+
+TOP_SLOTS = 10
+HEATMAP_SHADES = " ░▒▓█"
+
+def slot_label(slot):
+    day, hour = divmod(slot, SLOTS_PER_DAY)
+    return f"{DAY_NAMES[day]} {TIME_LABELS[hour]}"
+
+def summarise_availability(members, min_players=None):
+    """Work out the best slots and a per-day heatmap for a team's week.
+
+    Counting is bit-sliced across every slot at once (see **count_planes**),
+    so this stays fast for large rosters; it is still CPU work, so callers run
+    it off the event loop.
+
+    Args:
+        members (list[int]): Availability masks of the members to count.
+        min_players (int, optional): Players needed for a slot to qualify.
+            Defaults to every member in **members**.
+
+    Returns:
+        dict: ``needed``, ``top`` as ``(slot, count)`` pairs and ``heatmap`` lines.
+    """
+    planes = count_planes(members)
+    counts = plane_counts(planes)
+    needed = min_players if min_players else len(members)
+    qualifying = slots_at_least(planes, needed) if needed else 0
+    top = sorted(
+        ((slot, counts[slot]) for slot in range(len(counts)) if qualifying >> slot & 1),
+        key=lambda entry: (-entry[1], entry[0])
+    )[:TOP_SLOTS]
+
+    peak = max(counts) if counts else 0
+    heatmap = [" " * 4 + " ".join(label.split()[0].rjust(2) for label in TIME_LABELS)]
+    for day, name in enumerate(DAY_NAMES):
+        row = counts[day * SLOTS_PER_DAY:(day + 1) * SLOTS_PER_DAY]
+        shades = [HEATMAP_SHADES[-(-count * (len(HEATMAP_SHADES) - 1) // peak)] if peak else " " for count in row]
+        heatmap.append(f"{name[:3]} " + " ".join(shade * 2 for shade in shades) + f"  {max(row)}")
+    return {"needed": needed, "top": top, "heatmap": heatmap}
+
+SLOT_HOURS = [datetime.strptime(label, "%I %p").hour for label in TIME_LABELS]
+TOP_WINDOWS = 10
+
+@functools.lru_cache(maxsize=512)
+def week_slot_hours(tz_name, week):
+    """Return the UTC hour (hours since the epoch) each slot of a week starts at.
+
+    Slots are local times, so this is worked out for the actual dates of the
+    week and follows any DST change that falls inside it.
+
+    Args:
+        tz_name (str): IANA timezone name.
+        week (str): The local date of the week's Monday (YYYY-MM-DD).
+
+    Returns:
+        tuple[int]: One UTC hour per slot, indexed like availability masks.
+    """
+    tz = pytz.timezone(tz_name)
+    monday = datetime.strptime(week, "%Y-%m-%d")
+    hours = []
+    for day in range(len(DAY_NAMES)):
+        date = monday + timedelta(days=day)
+        for hour in SLOT_HOURS:
+            hours.append(int(tz.localize(date.replace(hour=hour)).timestamp()) // 3600)
+    return tuple(hours)
+
+SCRIM_CACHE_WEEKS = 32
+SCRIM_CACHE_PER_WEEK = 64
+
+class ScrimCache:
+    """Ranked scrim windows, grouped by (guild, week) and bounded both ways.
+
+    An entry is filed under the (guild, week) of each of its two teams, so an
+    availability change only has to drop that one group. Groups and entries
+    within a group are evicted least recently used first.
+    """
+
+    def __init__(self, max_weeks=SCRIM_CACHE_WEEKS, per_week=SCRIM_CACHE_PER_WEEK):
+        self.max_weeks = max_weeks
+        self.per_week = per_week
+        self._weeks = OrderedDict()
+
+    def get(self, weeks, key):
+        """Return the cached windows for **key**, filed under the ``(guild_id, week)`` pairs in **weeks**."""
+        group = self._weeks.get(weeks[0])
+        if group is None or key not in group:
+            return None
+        self._weeks.move_to_end(weeks[0])
+        group.move_to_end(key)
+        return group[key][1]
+
+    def put(self, weeks, key, windows):
+        for week in dict.fromkeys(weeks):
+            group = self._weeks.setdefault(week, OrderedDict())
+            self._weeks.move_to_end(week)
+            group[key] = (weeks, windows)
+            if len(group) > self.per_week:
+                group.popitem(last=False)
+        while len(self._weeks) > self.max_weeks:
+            self._weeks.popitem(last=False)
+
+    def invalidate(self, week):
+        """Drop every entry that involves ``(guild_id, week)``."""
+        for key, (weeks, _) in self._weeks.pop(week, {}).items():
+            for other in weeks:
+                group = self._weeks.get(other)
+                if group:
+                    group.pop(key, None)
+
+def utc_hour_mask(counts, hours, base, min_players):
+    # Bit (hour - base) is set for every slot with enough players free
+    mask, by_hour = 0, {}
+    for count, hour in zip(counts, hours):
+        if count >= min_players:
+            mask |= 1 << (hour - base)
+            by_hour[hour] = count
+    return mask, by_hour
+
+def find_common_windows(counts_a, hours_a, counts_b, hours_b, min_players=1):
+    """Rank the windows where both teams have enough players free.
+
+    Each team's qualifying slots are moved onto a shared UTC hour bitset and
+    intersected, then consecutive common hours are joined into windows.
+
+    Args:
+        counts_a (sequence[int]): Team A's free-member count per slot.
+        hours_a (sequence[int]): Team A's UTC hour per slot (see **week_slot_hours**).
+        counts_b (sequence[int]): Team B's free-member count per slot.
+        hours_b (sequence[int]): Team B's UTC hour per slot.
+        min_players (int, optional): Players each team needs free. Defaults to 1.
+
+    Returns:
+        list[tuple[int, int, int, int]]: ``(start_hour, hours, team_a_free, team_b_free)``
+        for the best windows, where the free counts are the lowest within the window.
+    """
+    base = min(min(hours_a), min(hours_b))
+    mask_a, by_hour_a = utc_hour_mask(counts_a, hours_a, base, min_players)
+    mask_b, by_hour_b = utc_hour_mask(counts_b, hours_b, base, min_players)
+
+    common = mask_a & mask_b
+    windows = []
+    while common:
+        start = (common & -common).bit_length() - 1
+        run = 0
+        while common >> (start + run) & 1:
+            run += 1
+        common &= ~(((1 << run) - 1) << start)
+        hours = range(base + start, base + start + run)
+        windows.append((base + start, run, min(by_hour_a[h] for h in hours), min(by_hour_b[h] for h in hours)))
+    windows.sort(key=lambda window: (-min(window[2], window[3]), -window[1], window[0]))
+    return windows[:TOP_WINDOWS]
 
 class TeamScheduleDropdown(discord.ui.Select):
     def __init__(self, teams):
         options = [
             discord.SelectOption(label=team["team_name"], value=str(idx))
             for idx, team in enumerate(teams)
-        ]
+        ][:MAX_CHOICES]
         super().__init__(placeholder="Select a team to send scheduling...", min_values=1, max_values=1, options=options)
 
     async def callback(self, interaction: discord.Interaction):
@@ -78,13 +404,7 @@ class TeamScheduleDropdown(discord.ui.Select):
 
         idx = int(self.values[0])
         team = self.view.teams[idx]
-        tz_name = team.get("timezone", "UTC")
-        try:
-            tz = pytz.timezone(tz_name)
-        except pytz.UnknownTimeZoneError:
-            tz = pytz.UTC
-
-        now = datetime.now(tz)
+        now = datetime.now(team_timezone(team))
         monday = get_previous_monday(now)
         channel_id = team.get("team_schedule_channel")
         channel = interaction.guild.get_channel(channel_id)
@@ -93,18 +413,13 @@ class TeamScheduleDropdown(discord.ui.Select):
             await interaction.followup.send("Schedule channel not found.", ephemeral=True)
             return
 
-        team_role_id = team.get("team_role")
-        team_role_mention = f"<@&{team_role_id}>" if team_role_id else ""
-
-        await send_weekly_schedule_messages(channel, team_role_mention, monday)
+        await send_team_schedule(channel, team, monday)
         await log_to_discord(self.view.bot, str(interaction.guild_id), f"Weekly scheduling messages sent for team {team['team_name']} by {interaction.user} ({interaction.user.id})")
 
         # Update last_synced for today (Monday)
-        today_str = now.strftime("%Y-%m-%d")
-        guild_id = str(interaction.guild_id)
-        servers = ReadJSON("data/servers.json")
-        servers = update_last_synced(servers, guild_id, idx, today_str)
-        WriteJSON(servers, "data/servers.json")
+        async with guild_lock(interaction.guild_id):
+            team["last_synced"] = now.strftime("%Y-%m-%d")
+            server_store.save(interaction.guild_id)
 
         await interaction.followup.send(
             f"Weekly scheduling messages sent for **{team['team_name']}**.", ephemeral=True
@@ -118,63 +433,335 @@ class TeamScheduleView(discord.ui.View):
         # Pass bot instance for logging
         self.bot = None
 
+# Sends missed while the bot was offline are still delivered if at most this late
+CATCH_UP_HOURS = 12
+CATCH_UP_BATCH = 10
+RETRY_MINUTES = 15
+
 class ScheduleCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.schedule_lock = asyncio.Lock()
+        self.scheduler = WeeklyScheduler(self.send_automated_schedules)
+        self.dispatcher = Dispatcher()
+        self.scheduler_task = None
+        self.in_flight = set()
+        self.scrim_cache = ScrimCache()
+        availability_store.add_listener(self.on_availability_change)
+        server_store.add_listener(self.on_config_change)
 
-    @tasks.loop(minutes=1)
-    async def schedule_core(self):
-        async with self.schedule_lock:
-            filename = "data/servers.json"
-            try:
-                data = ReadJSON(filename)
-            except FileNotFoundError:
-                data = {}
+    async def cog_load(self):
+        # Handles clicks on every grid schedule message, including ones sent before a restart
+        self.bot.add_dynamic_items(GridDaySelect, GridMineButton)
+        # Planned from the manifest's team names and timezones; no guild is loaded here
+        self.scheduler.plan_all(server_store.schedule_entries())
+        self.scheduler_task = asyncio.create_task(self.run_scheduler())
+        self.prune_availability.start()
+
+    async def cog_unload(self):
+        if self.scheduler_task:
+            self.scheduler_task.cancel()
+        self.prune_availability.cancel()
+        self.retry_pending.cancel()
+        self.bot.remove_dynamic_items(GridDaySelect, GridMineButton)
+
+    @tasks.loop(hours=6)
+    async def prune_availability(self):
+        # Weeks past the retention setting are dropped; recent ones stay queryable
+        removed = await availability_store.prune_past()
+        if removed:
+            print(f"Pruned {removed} past availability week(s)")
+
+    def on_config_change(self, guild_id):
+        # A no-op unless the guild's team names or timezones changed
+        if guild_id is None:
+            self.scheduler.plan_all(server_store.schedule_entries())
+        else:
+            self.scheduler.plan_guild(guild_id, server_store.schedule_entry(guild_id))
 
-            updated = False
+    def on_availability_change(self, week_key):
+        guild_id, _, week = availability_store.split_week_key(week_key)
+        self.scrim_cache.invalidate((guild_id, week))
 
-            for guild_id, guild_data in data.items():
-                if not guild_data.get("SetupComplete", False):
+    async def run_scheduler(self):
+        await self.bot.wait_until_ready()
+        await self.catch_up()
+        self.retry_pending.start()
+        await self.scheduler.run()
+
+    async def catch_up(self):
+        """Queue weekly sends missed while the bot was offline and deliver them in batches."""
+        now = datetime.now(timezone.utc)
+        window = timedelta(hours=CATCH_UP_HOURS)
+        for guild_id, entries in server_store.schedule_entries().items():
+            for entry in entries:
+                fired_at = previous_fire_time(entry, now)
+                if fired_at is None or now - fired_at > window:
                     continue
+                week = fired_at.astimezone(team_timezone(entry)).strftime("%Y-%m-%d")
+                job_queue.enqueue(guild_id, entry["team_name"], week, fired_at)
+
+        # Cut off mid-send by the restart: part of it may be posted, so don't post it twice
+        for job in job_queue.in_state(SENDING):
+            job_queue.set_state(job, INTERRUPTED)
+            print(f"Weekly schedule {job['key']} was interrupted mid-send; not resending")
+            await log_to_discord(self.bot, job["guild_id"], f"Automated weekly schedule for team {job['team_name']} (week of {job['week']}) was interrupted by a restart and was not resent. Use /send_schedule if it is incomplete.")
 
-                for idx, team in enumerate(guild_data.get("teams", [])):
-                    tz_name = team.get("timezone", "UTC")
-                    try:
-                        tz = pytz.timezone(tz_name)
-                    except pytz.UnknownTimeZoneError:
-                        tz = pytz.UTC
-
-                    now = datetime.now(tz)
-                    today_str = now.strftime("%Y-%m-%d")
-
-                    # Check last_synced
-                    last_synced = team.get("last_synced")
-                    if last_synced == today_str:
-                        continue
-
-                    if now.weekday() == 0 and now.hour == 12 and now.minute == 0:
-                        channel_id = team.get("team_schedule_channel")
-                        channel = self.bot.get_channel(channel_id)
-                        if channel:
-                            team_role_id = team.get("team_role")
-                            team_role_mention = f"<@&{team_role_id}>" if team_role_id else ""
-                            date_str = now.strftime("%A: The %d of %B")
-                            await send_schedule_message(channel, team_role_mention, date_str)
-                            await log_to_discord(self.bot, guild_id, f"Automated weekly schedule sent for team {team['team_name']} in guild {guild_id}")
-                            # Update last_synced
-                            data = update_last_synced(data, guild_id, idx, today_str)
-                            updated = True
-
-            if updated:
-                WriteJSON(data, filename)
+        await self.deliver_pending("catch-up")
+
+    @tasks.loop(minutes=RETRY_MINUTES)
+    async def retry_pending(self):
+        # Sends that failed before posting anything went back to pending;
+        # the first run would only repeat the catch-up that just finished
+        if self.retry_pending.current_loop == 0:
+            return
+        await self.deliver_pending("retry")
+
+    async def deliver_pending(self, label):
+        """Deliver every pending job still inside the catch-up window, in batches; expire the rest."""
+        now = datetime.now(timezone.utc)
+        window = timedelta(hours=CATCH_UP_HOURS)
+        jobs = []
+        for job in job_queue.pending():
+            if now - datetime.fromisoformat(job["due"]) > window:
+                job_queue.set_state(job, EXPIRED)
+                await log_to_discord(self.bot, job["guild_id"], f"Automated weekly schedule for team {job['team_name']} (week of {job['week']}) could not be sent in time and was dropped. Use /send_schedule to post it.")
+            else:
+                jobs.append(job)
+        for start in range(0, len(jobs), CATCH_UP_BATCH):
+            batch = jobs[start:start + CATCH_UP_BATCH]
+            await self.deliver_all(label, [(job, None) for job in batch])
+
+    async def send_automated_schedules(self, due):
+        """Scheduler callback: queue and deliver every team whose send time has arrived."""
+        batch = []
+        for guild_id, entry in due:
+            now = datetime.now(team_timezone(entry))
+            week = get_previous_monday(now).strftime("%Y-%m-%d")
+            # The team itself is looked up (loading its guild) in prepare
+            batch.append((job_queue.enqueue(guild_id, entry["team_name"], week, now), None))
+        await self.deliver_all("weekly schedule", batch)
+
+    async def deliver_all(self, label, batch):
+        """Deliver a batch of queued jobs through the dispatcher.
+
+        Args:
+            label (str): Name for the batch in the console report.
+            batch (list[tuple[dict, dict | None]]): ``(job, team)`` pairs; a team of
+                None is looked up from the job.
+
+        Returns:
+            dict: The dispatcher's report for the batch.
+        """
+        sends = []
+        for job, team in batch:
+            target = await self.prepare(job, team)
+            if target:
+                team, channel = target
+                sends.append((channel.id, functools.partial(self.deliver, job, team, channel)))
+        return await self.dispatcher.dispatch(label, sends)
+
+    async def prepare(self, job, team=None):
+        """Resolve a job's team and channel, or settle the job if it can't be sent.
+
+        Returns:
+            tuple[dict, discord.TextChannel] | None: What to send to, or None to skip.
+        """
+        if job["state"] != PENDING or job["key"] in self.in_flight:
+            return None
+        guild_id = job["guild_id"]
+        team = team or team_index.find(guild_id, job["team_name"])
+        if team is None:
+            job_queue.set_state(job, EXPIRED)
+            return None
+
+        # Already sent manually on that Monday
+        if team.get("last_synced") == job["week"]:
+            job_queue.set_state(job, SENT)
+            return None
+
+        channel = self.bot.get_channel(team.get("team_schedule_channel"))
+        if not channel:
+            job_queue.set_state(job, EXPIRED)
+            await log_to_discord(self.bot, guild_id, f"Automated weekly schedule failed: schedule channel not found for team {team['team_name']}")
+            return None
+
+        # Claimed until the send finishes so a racing batch skips it
+        self.in_flight.add(job["key"])
+        return team, channel
+
+    async def deliver(self, job, team, channel):
+        """Send one prepared weekly schedule and mark its job sent."""
+        guild_id = job["guild_id"]
+        try:
+            now = datetime.now(team_timezone(team))
+            monday = datetime.strptime(job["week"], "%Y-%m-%d")
+            # Both on disk before moving on, so a crash never leads to a second copy
+            await job_queue.commit_state(job, SENDING)
+            posted = []
+            try:
+                await send_team_schedule(channel, team, monday, posted)
+            except Exception as e:
+                if posted:
+                    # Some days are already posted; /send_schedule redoes it by hand
+                    await job_queue.commit_state(job, INTERRUPTED)
+                    await log_to_discord(self.bot, guild_id, f"Automated weekly schedule for team {team['team_name']} (week of {job['week']}) failed part-way ({e}) and was not resent. Use /send_schedule if it is incomplete.")
+                else:
+                    # Nothing reached the channel, so it is safe to try again
+                    await job_queue.commit_state(job, PENDING)
+                    await log_to_discord(self.bot, guild_id, f"Automated weekly schedule for team {team['team_name']} (week of {job['week']}) failed ({e}); it will be retried.")
+                raise
+            await job_queue.commit_state(job, SENT)
+        finally:
+            self.in_flight.discard(job["key"])
+
+        await log_to_discord(self.bot, guild_id, f"Automated weekly schedule sent for team {team['team_name']} in guild {guild_id}")
+        async with guild_lock(guild_id):
+            team["last_synced"] = now.strftime("%Y-%m-%d")
+            server_store.save(guild_id)
+
+    async def team_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=team_name, value=team_name)
+            for team_name in team_index.search(interaction.guild_id, current)
+        ]
+
+    @app_commands.command(name="availability_summary", description="Show the best times this week for a team (admin or team captain only).")
+    @app_commands.describe(
+        team_name="The team to summarise.",
+        min_players="Players needed for a slot to count (default: the whole team role).",
+        week="Any date in the week to summarise (YYYY-MM-DD, default: this week)."
+    )
+    @app_commands.autocomplete(team_name=team_autocomplete)
+    async def availability_summary(self, interaction: discord.Interaction, team_name: str, min_players: app_commands.Range[int, 1, 100] = None, week: str = None):
+        guild_id = str(interaction.guild_id)
+        team = team_index.find(guild_id, team_name)
+        if not team:
+            await interaction.response.send_message("Team not found.", ephemeral=True)
+            return
+        user_roles = [role.id for role in interaction.user.roles]
+        if not (CheckIfAdminRole(user_roles, guild_id) or CheckIfTeamCaptain(user_roles, guild_id, team["team_name"])):
+            await log_to_discord(self.bot, guild_id, f"Unauthorized availability_summary attempt by {interaction.user} ({interaction.user.id})")
+            await interaction.response.send_message("You do not have permission.", ephemeral=True)
+            return
+        try:
+            day = datetime.strptime(week, "%Y-%m-%d") if week else datetime.now(team_timezone(team))
+        except ValueError:
+            await interaction.response.send_message("Invalid date. Use YYYY-MM-DD.", ephemeral=True)
+            return
+        monday = get_previous_monday(day)
+        week_key = monday.strftime("%Y-%m-%d")
+
+        entry = availability_store.week(guild_id, team["team_name"], week_key)
+        answered = dict(entry.items()) if entry else {}
+        role = interaction.guild.get_role(team.get("team_role_id") or 0)
+        if role and role.members:
+            # Count the whole roster, with members who haven't answered as unavailable
+            members = [answered.get(member.id, 0) for member in role.members]
+        else:
+            members = list(answered.values())
+        if not any(members):
+            await interaction.response.send_message(f"No availability recorded for **{team['team_name']}** for the week of {week_key} yet.", ephemeral=True)
+            return
+
+        summary = await asyncio.to_thread(summarise_availability, members, min_players)
+        top = "\n".join(f"**{slot_label(slot)}**: {count}/{len(members)} free" for slot, count in summary["top"])
+        embed = discord.Embed(
+            title=f"Availability for {team['team_name']}",
+            description=f"Week of **{monday.strftime('%A: The %d of %B')}**, {len(answered)} of {len(members)} member(s) answered.",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name=f"Best times (at least {summary['needed']} free)", value=top or "No time works for that many players.", inline=False)
+        embed.add_field(name="Heatmap (darker = more free, peak per day on the right)", value="```\n" + "\n".join(summary["heatmap"]) + "\n```", inline=False)
+        await log_to_discord(self.bot, guild_id, f"availability_summary used for team {team['team_name']} by {interaction.user} ({interaction.user.id})")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="find_scrim_time", description="Find times this week when two teams are both free.")
+    @app_commands.describe(
+        team_a="The first team.",
+        team_b="The second team.",
+        min_players="Players each team needs free (default 1).",
+        week="Any date in the week to check (YYYY-MM-DD, default: this week)."
+    )
+    @app_commands.autocomplete(team_a=team_autocomplete, team_b=team_autocomplete)
+    async def find_scrim_time(self, interaction: discord.Interaction, team_a: str, team_b: str, min_players: app_commands.Range[int, 1, 100] = 1, week: str = None):
+        guild_id = str(interaction.guild_id)
+        teams = [team_index.find(guild_id, team_a), team_index.find(guild_id, team_b)]
+        if not all(teams):
+            await interaction.response.send_message("Team not found.", ephemeral=True)
+            return
+        if teams[0] is teams[1]:
+            await interaction.response.send_message("Pick two different teams.", ephemeral=True)
+            return
+        try:
+            day = datetime.strptime(week, "%Y-%m-%d") if week else None
+        except ValueError:
+            await interaction.response.send_message("Invalid date. Use YYYY-MM-DD.", ephemeral=True)
+            return
+        # "This week" is each team's own current week, in its own timezone
+        week_dates = [
+            get_previous_monday(day or datetime.now(team_timezone(team))).strftime("%Y-%m-%d")
+            for team in teams
+        ]
+        tz_names = [team_timezone(team).zone for team in teams]
+
+        weeks = [(guild_id, week_date) for week_date in week_dates]
+        cache_key = tuple(
+            (availability_store.week_key(guild_id, team["team_name"], week_date), tz_name)
+            for team, week_date, tz_name in zip(teams, week_dates, tz_names)
+        ) + (min_players,)
+        windows = self.scrim_cache.get(weeks, cache_key)
+        if windows is None:
+            counts = [
+                availability_store.slot_counts(guild_id, team["team_name"], week_date)
+                for team, week_date in zip(teams, week_dates)
+            ]
+            windows = find_common_windows(
+                counts[0], week_slot_hours(tz_names[0], week_dates[0]),
+                counts[1], week_slot_hours(tz_names[1], week_dates[1]),
+                min_players
+            )
+            self.scrim_cache.put(weeks, cache_key, windows)
+
+        name_a, name_b = teams[0]["team_name"], teams[1]["team_name"]
+        lines = [
+            f"**{rank}.** <t:{start * 3600}:F> – <t:{(start + length) * 3600}:t> ({length}h) · {name_a}: {free_a} free · {name_b}: {free_b} free"
+            for rank, (start, length, free_a, free_b) in enumerate(windows, start=1)
+        ]
+        embed = discord.Embed(
+            title=f"Scrim times: {name_a} vs {name_b}",
+            description="\n".join(lines) if lines else f"No overlapping times with at least {min_players} player(s) free on both teams.",
+            color=discord.Color.blue()
+        )
+        week_label = week_dates[0] if week_dates[0] == week_dates[1] else f"{week_dates[0]} ({name_a}) / {week_dates[1]} ({name_b})"
+        embed.set_footer(text=f"Week of {week_label}. Times are shown in your own timezone.")
+        await log_to_discord(self.bot, guild_id, f"find_scrim_time used for {name_a} vs {name_b} by {interaction.user} ({interaction.user.id})")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        self.record_reaction(payload, True)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        self.record_reaction(payload, False)
+
+    def record_reaction(self, payload, available):
+        """Apply a number reaction on a reaction-mode day message to the availability store."""
+        if payload.guild_id is None or payload.user_id == self.bot.user.id:
+            return
+        record = availability_store.lookup_message(payload.message_id)
+        if not record or "day" not in record:
+            return
+        slot = NUMBER_EMOJI_SLOTS.get(str(payload.emoji))
+        if slot is None:
+            return
+        availability_store.set_slot(record["guild_id"], record["team_name"], record["week"], payload.user_id, record["day"], slot, available)
 
     @app_commands.command(name="send_schedule", description="Send a scheduling message for a team (admin or team captain only).")
     async def send_schedule(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild_id)
         user_roles = [role.id for role in interaction.user.roles]
-        servers = ReadJSON("data/servers.json")
-        current_server = servers.get(guild_id, {})
+        current_server = server_store.get(guild_id, {})
         if not current_server.get("SetupComplete", False):
             await log_to_discord(self.bot, guild_id, f"send_schedule failed: bot not setup by {interaction.user} ({interaction.user.id})")
             await interaction.response.send_message("Bot not setup yet.", ephemeral=True)
@@ -186,10 +773,12 @@ class ScheduleCog(commands.Cog):
             return
 
         # Only allow admins or team captains to use
-        allowed_team_idxs = []
-        for idx, team in enumerate(teams):
-            if CheckIfAdminRole(user_roles, guild_id) or team.get("team_cap_role") in user_roles:
-                allowed_team_idxs.append(idx)
+        is_admin = CheckIfAdminRole(user_roles, guild_id)
+        captain_of = permission_index.captain_teams(user_roles, guild_id)
+        allowed_team_idxs = [
+            idx for idx, team in enumerate(teams)
+            if is_admin or team.get("team_name") in captain_of
+        ]
         if not allowed_team_idxs:
             await log_to_discord(self.bot, guild_id, f"send_schedule failed: no permission for any team by {interaction.user} ({interaction.user.id})")
             await interaction.response.send_message("You do not have permission to send scheduling for any team.", ephemeral=True)
@@ -200,11 +789,3 @@ class ScheduleCog(commands.Cog):
         view.bot = self.bot  # Pass bot instance for logging in dropdown
         await log_to_discord(self.bot, guild_id, f"send_schedule command used by {interaction.user} ({interaction.user.id})")
         await interaction.response.send_message("Select a team to send scheduling for:", view=view, ephemeral=True)
-
-async def send_schedule_message(channel, team_role_mention, date_str):
-    msg_content = build_day_message(team_role_mention, date_str)
-    number_emojis = get_number_emojis()
-    message = await channel.send(msg_content)
-    for emoji in number_emojis:
-        await message.add_reaction(emoji)
-
@@ -1,7 +1,9 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from utils.funcs import CheckIfAdminRole, ReadJSON, WriteJSON, log_to_discord
+from utils.funcs import CheckIfAdminRole, log_to_discord
+from utils.server_store import server_store
+from utils.locks import guild_lock
 
 
 class SetupCog(commands.Cog):
@@ -23,34 +25,32 @@ class SetupCog(commands.Cog):
         AdminRole = str(admin_role.id)
         UpdateLogsChannel = str(update_logs.id)
         
-        # Load existing server data
-        filename = "data/servers.json"
-        try:
-            data = ReadJSON(filename)
-        except FileNotFoundError:
-            data = {}
-
-        # Only allow setup if SetupComplete is not True
-        if GuildID in data and data[GuildID].get("SetupComplete", False):
-            await log_to_discord(self.bot, GuildID, f"Setup attempted but already completed by {interaction.user} ({interaction.user.id})")
-            return await interaction.response.send_message(
-                "Setup has already been completed for this server. Use other commands to modify settings.",
-                ephemeral=True
-            )
-
-        # Perform setup
-        data[GuildID] = {
-            "bot_channels": [BotChannel],
-            "admin_roles": [AdminRole],
-            "update_logs_channel": UpdateLogsChannel,
-            "bot_logs_channel": bot_logs.id,
-            "leagues": [],
-            "teams": [],
-            "SetupComplete": True
-        }
-
-        # Save updated data
-        WriteJSON(data, filename, indent=4)
+        error = None
+        async with guild_lock(GuildID):
+            # Load existing server data
+            current_server = server_store.get(GuildID, {})
+
+            # Only allow setup if SetupComplete is not True
+            if current_server.get("SetupComplete", False):
+                error = (f"Setup attempted but already completed by {interaction.user} ({interaction.user.id})", "Setup has already been completed for this server. Use other commands to modify settings.")
+            else:
+                # Perform setup
+                guild_data = {
+                    "bot_channels": [BotChannel],
+                    "admin_roles": [AdminRole],
+                    "update_logs_channel": UpdateLogsChannel,
+                    "bot_logs_channel": bot_logs.id,
+                    "leagues": [],
+                    "teams": [],
+                    "SetupComplete": True
+                }
+
+                # Save updated data
+                server_store.set(GuildID, guild_data)
+
+        if error:
+            await log_to_discord(self.bot, GuildID, error[0])
+            return await interaction.response.send_message(error[1], ephemeral=True)
 
         await log_to_discord(self.bot, GuildID, f"Setup completed by {interaction.user} ({interaction.user.id})")
 
@@ -84,35 +84,24 @@ Run /help to see a list of commands and how to utilize them.""",
                 ephemeral=True
             )
 
-        # Load existing server data
-        filename = "data/servers.json"
-        try:
-            data = ReadJSON(filename)
-        except FileNotFoundError:
-            await log_to_discord(self.bot, GuildID, f"addbotchannel failed: server not set up ({interaction.user.id})")
-            return await interaction.response.send_message(
-                "Server is not set up yet. Please run /setup first.",
-                ephemeral=True
-            )
+        error = None
+        async with guild_lock(GuildID):
+            # Load existing server data
+            guild_data = server_store.get(GuildID)
 
-        if GuildID not in data or not data[GuildID].get("SetupComplete", False):
-            await log_to_discord(self.bot, GuildID, f"addbotchannel failed: setup incomplete ({interaction.user.id})")
-            return await interaction.response.send_message(
-                "Server is not set up yet. Please run /setup first.",
-                ephemeral=True
-            )
-
-        if ChannelID in data[GuildID]["bot_channels"]:
-            await log_to_discord(self.bot, GuildID, f"addbotchannel: channel already exists ({ChannelID}) by {interaction.user.id}")
-            return await interaction.response.send_message(
-                f"Channel <#{ChannelID}> is already a bot channel.",
-                ephemeral=True
-            )
+            if guild_data is None or not guild_data.get("SetupComplete", False):
+                error = (f"addbotchannel failed: setup incomplete ({interaction.user.id})", "Server is not set up yet. Please run /setup first.")
+            elif ChannelID in guild_data["bot_channels"]:
+                error = (f"addbotchannel: channel already exists ({ChannelID}) by {interaction.user.id}", f"Channel <#{ChannelID}> is already a bot channel.")
+            else:
+                guild_data["bot_channels"].append(ChannelID)
 
-        data[GuildID]["bot_channels"].append(ChannelID)
+                # Save updated data
+                server_store.save(GuildID)
 
-        # Save updated data
-        WriteJSON(data, filename, indent=4)
+        if error:
+            await log_to_discord(self.bot, GuildID, error[0])
+            return await interaction.response.send_message(error[1], ephemeral=True)
 
         await log_to_discord(self.bot, GuildID, f"Bot channel <#{ChannelID}> added by {interaction.user} ({interaction.user.id})")
 
@@ -138,35 +127,24 @@ Run /help to see a list of commands and how to utilize them.""",
                 ephemeral=True
             )
 
-        # Load existing server data
-        filename = "data/servers.json"
-        try:
-            data = ReadJSON(filename)
-        except FileNotFoundError:
-            await log_to_discord(self.bot, GuildID, f"removebotchannel failed: server not set up ({interaction.user.id})")
-            return await interaction.response.send_message(
-                "Server is not set up yet. Please run /setup first.",
-                ephemeral=True
-            )
-
-        if GuildID not in data or not data[GuildID].get("SetupComplete", False):
-            await log_to_discord(self.bot, GuildID, f"removebotchannel failed: setup incomplete ({interaction.user.id})")
-            return await interaction.response.send_message(
-                "Server is not set up yet. Please run /setup first.",
-                ephemeral=True
-            )
+        error = None
+        async with guild_lock(GuildID):
+            # Load existing server data
+            guild_data = server_store.get(GuildID)
 
-        if ChannelID not in data[GuildID]["bot_channels"]:
-            await log_to_discord(self.bot, GuildID, f"removebotchannel: channel not found ({ChannelID}) by {interaction.user.id}")
-            return await interaction.response.send_message(
-                f"Channel <#{ChannelID}> is not a bot channel.",
-                ephemeral=True
-            )
+            if guild_data is None or not guild_data.get("SetupComplete", False):
+                error = (f"removebotchannel failed: setup incomplete ({interaction.user.id})", "Server is not set up yet. Please run /setup first.")
+            elif ChannelID not in guild_data["bot_channels"]:
+                error = (f"removebotchannel: channel not found ({ChannelID}) by {interaction.user.id}", f"Channel <#{ChannelID}> is not a bot channel.")
+            else:
+                guild_data["bot_channels"].remove(ChannelID)
 
-        data[GuildID]["bot_channels"].remove(ChannelID)
+                # Save updated data
+                server_store.save(GuildID)
 
-        # Save updated data
-        WriteJSON(data, filename, indent=4)
+        if error:
+            await log_to_discord(self.bot, GuildID, error[0])
+            return await interaction.response.send_message(error[1], ephemeral=True)
 
         await log_to_discord(self.bot, GuildID, f"Bot channel <#{ChannelID}> removed by {interaction.user} ({interaction.user.id})")
 
@@ -187,24 +165,16 @@ Run /help to see a list of commands and how to utilize them.""",
             )
         
         # Load existing server data
-        filename = "data/servers.json"
-        try:
-            data = ReadJSON(filename)
-        except FileNotFoundError:
-            await log_to_discord(self.bot, GuildID, f"listbotchannels failed: server not set up ({interaction.user.id})")
-            return await interaction.response.send_message(
-                "Server is not set up yet. Please run /setup first.",
-                ephemeral=True
-            )
+        guild_data = server_store.get(GuildID)
 
-        if GuildID not in data or not data[GuildID].get("SetupComplete", False):
+        if guild_data is None or not guild_data.get("SetupComplete", False):
             await log_to_discord(self.bot, GuildID, f"listbotchannels failed: setup incomplete ({interaction.user.id})")
             return await interaction.response.send_message(
                 "Server is not set up yet. Please run /setup first.",
                 ephemeral=True
             )
 
-        bot_channels = data[GuildID].get("bot_channels", [])
+        bot_channels = guild_data.get("bot_channels", [])
         if not bot_channels:
             await log_to_discord(self.bot, GuildID, f"listbotchannels: no bot channels set by {interaction.user.id}")
             return await interaction.response.send_message(
@@ -231,24 +201,16 @@ Run /help to see a list of commands and how to utilize them.""",
             )
         
         # Load existing server data
-        filename = "data/servers.json"
-        try:
-            data = ReadJSON(filename)
-        except FileNotFoundError:
-            await log_to_discord(self.bot, GuildID, f"listadminroles failed: server not set up ({interaction.user.id})")
-            return await interaction.response.send_message(
-                "Server is not set up yet. Please run /setup first.",
-                ephemeral=True
-            )
+        guild_data = server_store.get(GuildID)
 
-        if GuildID not in data or not data[GuildID].get("SetupComplete", False):
+        if guild_data is None or not guild_data.get("SetupComplete", False):
             await log_to_discord(self.bot, GuildID, f"listadminroles failed: setup incomplete ({interaction.user.id})")
             return await interaction.response.send_message(
                 "Server is not set up yet. Please run /setup first.",
                 ephemeral=True
             )
 
-        admin_roles = data[GuildID].get("admin_roles", [])
+        admin_roles = guild_data.get("admin_roles", [])
         if not admin_roles:
             await log_to_discord(self.bot, GuildID, f"listadminroles: no admin roles set by {interaction.user.id}")
             return await interaction.response.send_message(
@@ -280,34 +242,23 @@ Run /help to see a list of commands and how to utilize them.""",
                 ephemeral=True
             )
 
-        # Load existing server data
-        filename = "data/servers.json"
-        try:
-            data = ReadJSON(filename)
-        except FileNotFoundError:
-            await log_to_discord(self.bot, GuildID, f"addadminrole failed: server not set up ({interaction.user.id})")
-            return await interaction.response.send_message(
-                "Server is not set up yet. Please run /setup first.",
-                ephemeral=True
-            )
+        error = None
+        async with guild_lock(GuildID):
+            # Load existing server data
+            guild_data = server_store.get(GuildID)
 
-        if GuildID not in data or not data[GuildID].get("SetupComplete", False):
-            await log_to_discord(self.bot, GuildID, f"addadminrole failed: setup incomplete ({interaction.user.id})")
-            return await interaction.response.send_message(
-                "Server is not set up yet. Please run /setup first.",
-                ephemeral=True
-            )
+            if guild_data is None or not guild_data.get("SetupComplete", False):
+                error = (f"addadminrole failed: setup incomplete ({interaction.user.id})", "Server is not set up yet. Please run /setup first.")
+            elif RoleID in guild_data["admin_roles"]:
+                error = (f"addadminrole: role already exists ({RoleID}) by {interaction.user.id}", f"Role <@&{RoleID}> is already an admin role.")
+            else:
+                guild_data["admin_roles"].append(RoleID)
 
-        if RoleID in data[GuildID]["admin_roles"]:
-            await log_to_discord(self.bot, GuildID, f"addadminrole: role already exists ({RoleID}) by {interaction.user.id}")
-            return await interaction.response.send_message(
-                f"Role <@&{RoleID}> is already an admin role.",
-                ephemeral=True
-            )
+                server_store.save(GuildID)
 
-        data[GuildID]["admin_roles"].append(RoleID)
-
-        WriteJSON(data, filename, indent=4)
+        if error:
+            await log_to_discord(self.bot, GuildID, error[0])
+            return await interaction.response.send_message(error[1], ephemeral=True)
 
         await log_to_discord(self.bot, GuildID, f"Admin role <@&{RoleID}> added by {interaction.user} ({interaction.user.id})")
 
@@ -333,35 +284,24 @@ Run /help to see a list of commands and how to utilize them.""",
                 ephemeral=True
             )
 
-        # Load existing server data
-        filename = "data/servers.json"
-        try:
-            data = ReadJSON(filename)
-        except FileNotFoundError:
-            await log_to_discord(self.bot, GuildID, f"removeadminrole failed: server not set up ({interaction.user.id})")
-            return await interaction.response.send_message(
-                "Server is not set up yet. Please run /setup first.",
-                ephemeral=True
-            )
+        error = None
+        async with guild_lock(GuildID):
+            # Load existing server data
+            guild_data = server_store.get(GuildID)
 
-        if GuildID not in data or not data[GuildID].get("SetupComplete", False):
-            await log_to_discord(self.bot, GuildID, f"removeadminrole failed: setup incomplete ({interaction.user.id})")
-            return await interaction.response.send_message(
-                "Server is not set up yet. Please run /setup first.",
-                ephemeral=True
-            )
-
-        if RoleID not in data[GuildID]["admin_roles"]:
-            await log_to_discord(self.bot, GuildID, f"removeadminrole: role not found ({RoleID}) by {interaction.user.id}")
-            return await interaction.response.send_message(
-                f"Role <@&{RoleID}> is not an admin role.",
-                ephemeral=True
-            )
+            if guild_data is None or not guild_data.get("SetupComplete", False):
+                error = (f"removeadminrole failed: setup incomplete ({interaction.user.id})", "Server is not set up yet. Please run /setup first.")
+            elif RoleID not in guild_data["admin_roles"]:
+                error = (f"removeadminrole: role not found ({RoleID}) by {interaction.user.id}", f"Role <@&{RoleID}> is not an admin role.")
+            else:
+                guild_data["admin_roles"].remove(RoleID)
 
-        data[GuildID]["admin_roles"].remove(RoleID)
+                # Save updated data
+                server_store.save(GuildID)
 
-        # Save updated data
-        WriteJSON(data, filename, indent=4)
+        if error:
+            await log_to_discord(self.bot, GuildID, error[0])
+            return await interaction.response.send_message(error[1], ephemeral=True)
 
         await log_to_discord(self.bot, GuildID, f"Admin role <@&{RoleID}> removed by {interaction.user} ({interaction.user.id})")
 
@@ -385,30 +325,27 @@ Run /help to see a list of commands and how to utilize them.""",
                 ephemeral=True
             )
 
-        filename = "data/servers.json"
-        try:
-            data = ReadJSON(filename)
-        except FileNotFoundError:
-            data = {}
-
-        # If server not setup, create minimal entry
-        if GuildID not in data:
-            data[GuildID] = {"SetupComplete": False}
-
-        # If bot_logs_channel key doesn't exist, create it
-        if "bot_logs_channel" not in data[GuildID]:
-            data[GuildID]["bot_logs_channel"] = None
-
-        if not data[GuildID].get("SetupComplete", False):
-            await log_to_discord(self.bot, GuildID, f"setbotlogchannel failed: setup incomplete ({interaction.user.id})")
-            return await interaction.response.send_message(
-                "Server is not set up yet. Please run /setup first.",
-                ephemeral=True
-            )
-
-        old_channel = data[GuildID].get("bot_logs_channel")
-        data[GuildID]["bot_logs_channel"] = str(channel.id)
-        WriteJSON(data, filename, indent=4)
+        error = None
+        async with guild_lock(GuildID):
+            # If server not setup, create minimal entry
+            guild_data = server_store.get(GuildID)
+            if guild_data is None:
+                guild_data = {"SetupComplete": False}
+
+            # If bot_logs_channel key doesn't exist, create it
+            if "bot_logs_channel" not in guild_data:
+                guild_data["bot_logs_channel"] = None
+
+            if not guild_data.get("SetupComplete", False):
+                error = (f"setbotlogchannel failed: setup incomplete ({interaction.user.id})", "Server is not set up yet. Please run /setup first.")
+            else:
+                old_channel = guild_data.get("bot_logs_channel")
+                guild_data["bot_logs_channel"] = str(channel.id)
+                server_store.save(GuildID)
+
+        if error:
+            await log_to_discord(self.bot, GuildID, error[0])
+            return await interaction.response.send_message(error[1], ephemeral=True)
 
         await log_to_discord(self.bot, GuildID, f"Bot log channel changed from {old_channel} to {channel.id} by {interaction.user} ({interaction.user.id})")
         await interaction.response.send_message(
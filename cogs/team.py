@@ -1,17 +1,20 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from utils.funcs import ReadJSON, WriteJSON, CheckIfAdminRole, log_to_discord
+from utils.funcs import CheckIfAdminRole, log_to_discord
+from utils.server_store import server_store
+from utils.locks import guild_lock
+from utils.team_index import team_index, MAX_CHOICES
 import math
 
 # ---------- CONSTANTS ----------
-from utils.constants import MAJOR_TIMEZONES
+from utils.constants import MAJOR_TIMEZONES, SCHEDULE_MODES, REACTION_MODE
 
 # ---------- DELETE TEAM ----------
 
 class TeamDeleteDropdown(discord.ui.Select):
     def __init__(self, teams):
-        options = [discord.SelectOption(label=team["team_name"], value=str(idx)) for idx, team in enumerate(teams)]
+        options = [discord.SelectOption(label=team["team_name"], value=str(idx)) for idx, team in enumerate(teams)][:MAX_CHOICES]
         super().__init__(placeholder="Select a team to delete...", min_values=1, max_values=1, options=options)
 
     async def callback(self, interaction: discord.Interaction):
@@ -19,13 +22,18 @@ class TeamDeleteDropdown(discord.ui.Select):
         idx = int(self.values[0])
         team = view.teams[idx]
         guild_id = str(interaction.guild_id)
-        servers = ReadJSON("data/servers.json")
-        current_server = servers.get(guild_id, {})
-        teams = current_server.get("teams", [])
-        teams.pop(idx)
-        current_server["teams"] = teams
-        servers[guild_id] = current_server
-        WriteJSON(servers, "data/servers.json")
+        async with guild_lock(guild_id):
+            current_server = server_store.get(guild_id, {})
+            teams = current_server.get("teams", [])
+            # The list may have changed since this dropdown was built, so match by team, not index
+            exists = team in teams
+            if exists:
+                teams.remove(team)
+                current_server["teams"] = teams
+                server_store.set(guild_id, current_server)
+        if not exists:
+            await interaction.response.edit_message(content=f"Team '{team['team_name']}' no longer exists.", view=None, embed=None)
+            return
         await log_to_discord(interaction.client, guild_id, f"Team '{team['team_name']}' deleted by {interaction.user} ({interaction.user.id})")
         await interaction.response.edit_message(content=f"Team '{team['team_name']}' deleted.", view=None, embed=None)
 
@@ -37,6 +45,25 @@ class TeamDeleteView(discord.ui.View):
 
 # ---------- MODIFY TEAM ----------
 
+async def update_team_field(guild_id, team, field, value):
+    """Set one field of a team under the guild lock.
+
+    The team is matched by identity, not by its index in the list, because a
+    concurrent delete can shift the list while a modify view is open.
+
+    Returns:
+        dict | None: The updated team, or None if it no longer exists.
+    """
+    async with guild_lock(guild_id):
+        current_server = server_store.get(guild_id, {})
+        if not any(t is team for t in current_server.get("teams", [])):
+            return None
+        team[field] = value
+        server_store.set(guild_id, current_server)
+    return team
+
+TEAM_GONE = "This team no longer exists."
+
 class TeamModifyView(discord.ui.View):
     """Main modify view for a specific team with looping."""
     def __init__(self, teams, guild: discord.Guild, team_idx: int, root_view=None):
@@ -75,7 +102,7 @@ class TeamModifyView(discord.ui.View):
 
     async def change_team(self, interaction: discord.Interaction):
         # Display the team select dropdown again
-        options = [discord.SelectOption(label=t["team_name"], value=str(i)) for i,t in enumerate(self.teams)]
+        options = [discord.SelectOption(label=t["team_name"], value=str(i)) for i,t in enumerate(self.teams)][:MAX_CHOICES]
         class TeamSelect(discord.ui.Select):
             def __init__(self_inner):
                 super().__init__(placeholder="Select a team to modify...", min_values=1, max_values=1, options=options)
@@ -92,6 +119,7 @@ class TeamFieldDropdownLoop(discord.ui.Select):
     def __init__(self, teams, team_idx, guild: discord.Guild, parent_view):
         self.teams = teams
         self.team_idx = team_idx
+        self.team = teams[team_idx]
         self.guild = guild
         self.parent_view = parent_view
         options = [
@@ -100,13 +128,19 @@ class TeamFieldDropdownLoop(discord.ui.Select):
             discord.SelectOption(label="Team Captain", value="team_captain_id"),
             discord.SelectOption(label="Team Role", value="team_role_id"),
             discord.SelectOption(label="Schedule Channel", value="team_schedule_channel"),
-            discord.SelectOption(label="Timezone", value="timezone")
+            discord.SelectOption(label="Timezone", value="timezone"),
+            discord.SelectOption(label="Schedule Mode", value="schedule_mode")
         ]
         super().__init__(placeholder="Select a field to modify...", min_values=1, max_values=1, options=options)
 
     async def callback(self, interaction: discord.Interaction):
         field = self.values[0]
-        team = self.teams[self.team_idx]
+        team = self.team
+        # Other teams may have been deleted since this view was built
+        self.team_idx = next((idx for idx, t in enumerate(self.teams) if t is team), None)
+        if self.team_idx is None:
+            await interaction.response.send_message(TEAM_GONE, ephemeral=True)
+            return
         view = discord.ui.View()
 
         # Team Captain
@@ -133,6 +167,12 @@ class TeamFieldDropdownLoop(discord.ui.Select):
             await interaction.response.edit_message(content=f"Select timezone for **{team['team_name']}**:", view=tz_select)
             return
 
+        # Schedule mode
+        elif field == "schedule_mode":
+            mode_options = [discord.SelectOption(label=mode.title(), value=mode) for mode in SCHEDULE_MODES]
+            mode_select = ScheduleModeSelectLoop(self.teams, self.team_idx, field, mode_options, self.parent_view)
+            view.add_item(mode_select)
+
         # Text fields
         else:
             await interaction.response.send_modal(TeamModifyModalLoop(self.teams, self.team_idx, field, team.get(field, "")))
@@ -148,7 +188,7 @@ class TeamFieldDropdownLoop(discord.ui.Select):
         # Team select button
         team_select_btn = discord.ui.Button(label="Change Team", style=discord.ButtonStyle.secondary)
         async def team_callback(i: discord.Interaction):
-            options = [discord.SelectOption(label=t["team_name"], value=str(idx)) for idx,t in enumerate(self.teams)]
+            options = [discord.SelectOption(label=t["team_name"], value=str(idx)) for idx,t in enumerate(self.teams)][:MAX_CHOICES]
             class TeamSelect(discord.ui.Select):
                 def __init__(self_inner):
                     super().__init__(placeholder="Select a team to modify...", min_values=1, max_values=1, options=options)
@@ -170,20 +210,18 @@ class RoleSelectLoop(discord.ui.Select):
     def __init__(self, teams, team_idx, field, options, parent_view):
         self.teams = teams
         self.team_idx = team_idx
+        self.team = teams[team_idx]
         self.field = field
         self.parent_view = parent_view
         super().__init__(placeholder=f"Select new {field.replace('_',' ').title()}...", min_values=1, max_values=1, options=options)
 
     async def callback(self, interaction: discord.Interaction):
         new_role_id = int(self.values[0])
-        team = self.teams[self.team_idx]
-        team[self.field] = new_role_id
         guild_id = str(interaction.guild_id)
-        servers = ReadJSON("data/servers.json")
-        current_server = servers.get(guild_id, {})
-        current_server["teams"] = self.teams
-        servers[guild_id] = current_server
-        WriteJSON(servers, "data/servers.json")
+        team = await update_team_field(guild_id, self.team, self.field, new_role_id)
+        if team is None:
+            await interaction.response.send_message(TEAM_GONE, ephemeral=True)
+            return
         role = interaction.guild.get_role(new_role_id)
         await log_to_discord(interaction.client, guild_id, f"Updated {self.field} for team '{team['team_name']}' to role '{role.name if role else new_role_id}' by {interaction.user} ({interaction.user.id})")
         await interaction.response.send_message(f"Updated **Team Role** to **{role.mention if role else new_role_id}** for team **{team['team_name']}**.", ephemeral=True)
@@ -193,25 +231,43 @@ class ChannelSelectLoop(discord.ui.Select):
     def __init__(self, teams, team_idx, field, options, parent_view):
         self.teams = teams
         self.team_idx = team_idx
+        self.team = teams[team_idx]
         self.field = field
         self.parent_view = parent_view
         super().__init__(placeholder=f"Select new {field.replace('_',' ').title()}...", min_values=1, max_values=1, options=options)
 
     async def callback(self, interaction: discord.Interaction):
         new_channel_id = int(self.values[0])
-        team = self.teams[self.team_idx]
-        team[self.field] = new_channel_id
         guild_id = str(interaction.guild_id)
-        servers = ReadJSON("data/servers.json")
-        current_server = servers.get(guild_id, {})
-        current_server["teams"] = self.teams
-        servers[guild_id] = current_server
-        WriteJSON(servers, "data/servers.json")
+        team = await update_team_field(guild_id, self.team, self.field, new_channel_id)
+        if team is None:
+            await interaction.response.send_message(TEAM_GONE, ephemeral=True)
+            return
         channel = interaction.guild.get_channel(new_channel_id)
         await log_to_discord(interaction.client, guild_id, f"Updated {self.field} for team '{team['team_name']}' to channel '{channel.name}' by {interaction.user} ({interaction.user.id})")
         await interaction.response.send_message(f"Updated **{self.field.replace('_',' ').title()}** to **{channel.name}** for team **{team['team_name']}**.", ephemeral=True)
         await interaction.edit_original_response(view=self.parent_view)
 
+class ScheduleModeSelectLoop(discord.ui.Select):
+    def __init__(self, teams, team_idx, field, options, parent_view):
+        self.teams = teams
+        self.team_idx = team_idx
+        self.team = teams[team_idx]
+        self.field = field
+        self.parent_view = parent_view
+        super().__init__(placeholder="Select a schedule mode...", min_values=1, max_values=1, options=options)
+
+    async def callback(self, interaction: discord.Interaction):
+        mode = self.values[0]
+        guild_id = str(interaction.guild_id)
+        team = await update_team_field(guild_id, self.team, self.field, mode)
+        if team is None:
+            await interaction.response.send_message(TEAM_GONE, ephemeral=True)
+            return
+        await log_to_discord(interaction.client, guild_id, f"Updated schedule mode for team '{team['team_name']}' to '{mode}' by {interaction.user} ({interaction.user.id})")
+        await interaction.response.send_message(f"Updated schedule mode for **{team['team_name']}** to `{mode}`.", ephemeral=True)
+        await interaction.edit_original_response(view=self.parent_view)
+
 class TimezoneSelectPaginated(discord.ui.View):
     """Shows paginated dropdown for timezones (10 per page)."""
     def __init__(self, teams, team_idx, field, parent_view):
@@ -266,7 +322,7 @@ class TimezoneSelectPaginated(discord.ui.View):
         await interaction.response.edit_message(content=f"Modify team: **{self.teams[self.team_idx]['team_name']}**", view=self.parent_view)
 
     async def change_team(self, interaction: discord.Interaction):
-        options = [discord.SelectOption(label=t["team_name"], value=str(idx)) for idx,t in enumerate(self.teams)]
+        options = [discord.SelectOption(label=t["team_name"], value=str(idx)) for idx,t in enumerate(self.teams)][:MAX_CHOICES]
         class TeamSelect(discord.ui.Select):
             def __init__(self_inner):
                 super().__init__(placeholder="Select a team to modify...", min_values=1, max_values=1, options=options)
@@ -282,6 +338,7 @@ class TimezoneSelectDropdown(discord.ui.Select):
     def __init__(self, teams, team_idx, field, options, parent_view, parent_paginated_view):
         self.teams = teams
         self.team_idx = team_idx
+        self.team = teams[team_idx]
         self.field = field
         self.parent_view = parent_view
         self.parent_paginated_view = parent_paginated_view
@@ -289,14 +346,11 @@ class TimezoneSelectDropdown(discord.ui.Select):
 
     async def callback(self, interaction: discord.Interaction):
         tz = self.values[0]
-        team = self.teams[self.team_idx]
-        team[self.field] = tz
         guild_id = str(interaction.guild_id)
-        servers = ReadJSON("data/servers.json")
-        current_server = servers.get(guild_id, {})
-        current_server["teams"] = self.teams
-        servers[guild_id] = current_server
-        WriteJSON(servers, "data/servers.json")
+        team = await update_team_field(guild_id, self.team, self.field, tz)
+        if team is None:
+            await interaction.response.send_message(TEAM_GONE, ephemeral=True)
+            return
         await log_to_discord(interaction.client, guild_id, f"Updated timezone for team '{team['team_name']}' to '{tz}' by {interaction.user} ({interaction.user.id})")
         await interaction.response.send_message(f"Updated timezone for **{team['team_name']}** to `{tz}`.", ephemeral=True)
         await interaction.edit_original_response(view=self.parent_view)
@@ -306,20 +360,18 @@ class TeamModifyModalLoop(discord.ui.Modal):
         super().__init__(title=f"Modify {field.replace('_',' ').title()}")
         self.teams = teams
         self.team_idx = team_idx
+        self.team = teams[team_idx]
         self.field = field
         self.input = discord.ui.TextInput(label=f"New value for {field.replace('_',' ').title()}", default=str(current_value), required=True)
         self.add_item(self.input)
 
     async def on_submit(self, interaction: discord.Interaction):
         new_value = self.input.value
-        team = self.teams[self.team_idx]
-        team[self.field] = new_value
         guild_id = str(interaction.guild_id)
-        servers = ReadJSON("data/servers.json")
-        current_server = servers.get(guild_id, {})
-        current_server["teams"] = self.teams
-        servers[guild_id] = current_server
-        WriteJSON(servers, "data/servers.json")
+        team = await update_team_field(guild_id, self.team, self.field, new_value)
+        if team is None:
+            await interaction.response.send_message(TEAM_GONE, ephemeral=True)
+            return
         await log_to_discord(interaction.client, guild_id, f"Updated {self.field} for team '{team['team_name']}' to '{new_value}' by {interaction.user} ({interaction.user.id})")
         await interaction.response.send_message(f"Updated **{self.field.replace('_',' ').title()}** to `{new_value}` for team **{team['team_name']}**.", ephemeral=True)
 
@@ -386,6 +438,7 @@ class TeamListView(discord.ui.View):
                     f"Team Role: {team_role.mention if team_role else 'Role not found'}\n"
                     f"Schedule Channel: {team_schedule_channel.mention if team_schedule_channel else 'Channel not found'}\n"
                     f"Timezone: {team['timezone']}\n"
+                    f"Schedule Mode: {team.get('schedule_mode', REACTION_MODE).title()}\n"
                     f"Created At: {team['created_at']}"
                 ),
                 inline=False
@@ -399,6 +452,12 @@ class TeamCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def team_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=team_name, value=team_name)
+            for team_name in team_index.search(interaction.guild_id, current)
+        ]
+
     async def timezone_autocomplete(self, interaction: discord.Interaction, current: str):
         return [
             app_commands.Choice(name=tz, value=tz)
@@ -407,6 +466,8 @@ class TeamCog(commands.Cog):
         ][:25]
 
     @app_commands.command(name="create_team", description="Create a new team")
+    @app_commands.describe(schedule_mode="How weekly availability is collected (default: reactions).")
+    @app_commands.choices(schedule_mode=[app_commands.Choice(name=mode.title(), value=mode) for mode in SCHEDULE_MODES])
     @app_commands.autocomplete(timezone=timezone_autocomplete)
     async def create_team(
         self,
@@ -416,7 +477,8 @@ class TeamCog(commands.Cog):
         team_captain: discord.Member,
         team_role: discord.Role,
         team_schedule_channel: discord.TextChannel,
-        timezone: str
+        timezone: str,
+        schedule_mode: str = REACTION_MODE
     ):
         guild_id = str(interaction.guild_id)
         user_roles = [role.id for role in interaction.user.roles]
@@ -424,29 +486,31 @@ class TeamCog(commands.Cog):
             await log_to_discord(self.bot, guild_id, f"Unauthorized create_team attempt by {interaction.user} ({interaction.user.id})")
             await interaction.response.send_message("You do not have permission.", ephemeral=True)
             return
-        current_server = ReadJSON("data/servers.json").get(guild_id, {})
-        if not current_server.get("SetupComplete", False):
+        async with guild_lock(guild_id):
+            current_server = server_store.get(guild_id, {})
+            setup_complete = current_server.get("SetupComplete", False)
+            if setup_complete:
+                teams = current_server.get("teams", [])
+                team_data = {
+                    "team_name": team_name,
+                    "game": game,
+                    "team_captain_id": team_captain.id,
+                    "team_role_id": team_role.id,
+                    "team_schedule_channel": team_schedule_channel.id,
+                    "timezone": timezone,
+                    "schedule_mode": schedule_mode,
+                    "created_at": str(interaction.created_at)
+                }
+                teams.append(team_data)
+                current_server["teams"] = teams
+                server_store.set(guild_id, current_server)
+        if not setup_complete:
             await log_to_discord(self.bot, guild_id, f"create_team failed: bot not setup by {interaction.user} ({interaction.user.id})")
             await interaction.response.send_message("Bot not setup yet.", ephemeral=True)
             return
-        teams = current_server.get("teams", [])
-        team_data = {
-            "team_name": team_name,
-            "game": game,
-            "team_captain_id": team_captain.id,
-            "team_role_id": team_role.id,
-            "team_schedule_channel": team_schedule_channel.id,
-            "timezone": timezone,
-            "created_at": str(interaction.created_at)
-        }
-        teams.append(team_data)
-        current_server["teams"] = teams
-        all_servers = ReadJSON("data/servers.json")
-        all_servers[guild_id] = current_server
-        WriteJSON(all_servers, "data/servers.json")
         await log_to_discord(self.bot, guild_id, f"Team '{team_name}' created for '{game}' by {interaction.user} ({interaction.user.id})")
         await interaction.response.send_message(
-            f"Team '{team_name}' created for '{game}'. Captain: {team_captain.mention}, Role: {team_role.mention}, Channel: {team_schedule_channel.mention}, Timezone: {timezone}",
+            f"Team '{team_name}' created for '{game}'. Captain: {team_captain.mention}, Role: {team_role.mention}, Channel: {team_schedule_channel.mention}, Timezone: {timezone}, Schedule Mode: {schedule_mode.title()}",
             ephemeral=True
         )
 
@@ -459,7 +523,7 @@ class TeamCog(commands.Cog):
             await log_to_discord(self.bot, guild_id, f"Unauthorized list_teams attempt by {interaction.user} ({interaction.user.id})")
             await interaction.response.send_message("You do not have permission.", ephemeral=True)
             return
-        current_server = ReadJSON("data/servers.json").get(guild_id, {})
+        current_server = server_store.get(guild_id, {})
         if not current_server.get("SetupComplete", False):
             await log_to_discord(self.bot, guild_id, f"list_teams failed: bot not setup by {interaction.user} ({interaction.user.id})")
             await interaction.response.send_message("Bot not setup yet.", ephemeral=True)
@@ -474,40 +538,60 @@ class TeamCog(commands.Cog):
         await interaction.response.send_message(embed=view.get_embed(), view=view, ephemeral=True)
 
     @app_commands.command(name="delete_team", description="Delete a team from this server.")
-    async def delete_team(self, interaction: discord.Interaction):
+    @app_commands.describe(team_name="Jump straight to this team (optional).")
+    @app_commands.autocomplete(team_name=team_autocomplete)
+    async def delete_team(self, interaction: discord.Interaction, team_name: str = None):
         guild_id = str(interaction.guild_id)
         user_roles = [role.id for role in interaction.user.roles]
         if not CheckIfAdminRole(user_roles, guild_id):
             await log_to_discord(self.bot, guild_id, f"Unauthorized delete_team attempt by {interaction.user} ({interaction.user.id})")
             await interaction.response.send_message("No permission.", ephemeral=True)
             return
-        current_server = ReadJSON("data/servers.json").get(guild_id, {})
+        current_server = server_store.get(guild_id, {})
         teams = current_server.get("teams", [])
         if not teams:
             await log_to_discord(self.bot, guild_id, f"delete_team: no teams to delete by {interaction.user} ({interaction.user.id})")
             await interaction.response.send_message("No teams to delete.", ephemeral=True)
             return
+        content = "Select a team to delete:"
+        if team_name:
+            team = team_index.find(guild_id, team_name)
+            if not team:
+                await interaction.response.send_message("Team not found.", ephemeral=True)
+                return
+            teams = [team]
+        elif len(teams) > MAX_CHOICES:
+            content += f"\n(Showing the first {MAX_CHOICES} teams. Use the `team_name` option to pick any team.)"
         view = TeamDeleteView(teams)
         await log_to_discord(self.bot, guild_id, f"Team delete view sent by {interaction.user} ({interaction.user.id})")
-        await interaction.response.send_message("Select a team to delete:", view=view, ephemeral=True)
+        await interaction.response.send_message(content, view=view, ephemeral=True)
 
     @app_commands.command(name="modify_team", description="Modify a team's details.")
-    async def modify_team(self, interaction: discord.Interaction):
+    @app_commands.describe(team_name="Jump straight to this team (optional).")
+    @app_commands.autocomplete(team_name=team_autocomplete)
+    async def modify_team(self, interaction: discord.Interaction, team_name: str = None):
         guild_id = str(interaction.guild_id)
         user_roles = [role.id for role in interaction.user.roles]
         if not CheckIfAdminRole(user_roles, guild_id):
             await log_to_discord(self.bot, guild_id, f"Unauthorized modify_team attempt by {interaction.user} ({interaction.user.id})")
             await interaction.response.send_message("No permission.", ephemeral=True)
             return
-        current_server = ReadJSON("data/servers.json").get(guild_id, {})
+        current_server = server_store.get(guild_id, {})
         teams = current_server.get("teams", [])
         if not teams:
             await log_to_discord(self.bot, guild_id, f"modify_team: no teams found by {interaction.user} ({interaction.user.id})")
             await interaction.response.send_message("No teams found.", ephemeral=True)
             return
-        view = TeamModifyView(teams, interaction.guild, 0)
+        team_idx = 0
+        if team_name:
+            team = team_index.find(guild_id, team_name)
+            if not team:
+                await interaction.response.send_message("Team not found.", ephemeral=True)
+                return
+            team_idx = next(idx for idx, t in enumerate(teams) if t is team)
+        view = TeamModifyView(teams, interaction.guild, team_idx)
         await log_to_discord(self.bot, guild_id, f"Team modify view sent by {interaction.user} ({interaction.user.id})")
-        await interaction.response.send_message(content=f"Modify team: **{teams[0]['team_name']}**", view=view, ephemeral=True)
+        await interaction.response.send_message(content=f"Modify team: **{teams[team_idx]['team_name']}**", view=view, ephemeral=True)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(TeamCog(bot))
@@ -1,5 +1,5 @@
 from discord.ext import commands
-from utils.funcs import ReadJSON
+from utils.server_store import server_store
 import os
 
 OWNER_ID = int(os.getenv("OWNER_ID", "0"))
@@ -16,9 +16,9 @@ class UpdateCog(commands.Cog):
             return
 
         try:
-            servers = ReadJSON("data/servers.json")
+            servers = server_store.all()
         except Exception as e:
-            await ctx.send(f"Error reading servers.json: {e}")
+            await ctx.send(f"Error reading server config: {e}")
             return
 
         try:
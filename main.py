@@ -5,6 +5,11 @@ import discord
 from discord.ext import commands
 from cogs.init import get_cogs
 from utils.stats_cache import cache_stats
+from utils.server_store import server_store
+from utils.job_queue import job_queue
+from utils.availability import availability_store
+from utils.event_store import event_store
+from utils.log_pipeline import log_pipeline
 
 load_dotenv()
 token = os.getenv("DISCORD_TOKEN")
@@ -60,5 +65,18 @@ async def setup_hook():
 
 client.setup_hook = setup_hook
 
+# Send any batched guild logs while the connection is still open
+async def close():
+    await log_pipeline.flush()
+    await commands.Bot.close(client)
+
+client.close = close
+
 # Run the bot
 client.run(token)
+
+# Write out anything still queued by the background persister
+server_store.flush_sync()
+job_queue.flush_sync()
+availability_store.flush_sync()
+event_store.flush_sync()
@@ -0,0 +1,41 @@
+import argparse
+import json
+import os
+from utils.constants import SQLITE_PATH
+from utils.storage import MigrateServersToShards, ShardedJSONServerBackend, JSONEventBackend, SQLiteBackend, SERVERS_FILE
+
+def MigrateToSQLite(db_path=SQLITE_PATH):
+    """Copy data/guilds/*.json and every data/events/<guild_id>.json into a SQLite database.
+
+    Safe to re-run: rows are upserted, and the JSON files are left untouched.
+
+    Args:
+        db_path (path, optional): The database to create or update.
+    """
+    servers = ShardedJSONServerBackend().load_all()
+    events_backend = JSONEventBackend()
+    db = SQLiteBackend(db_path)
+
+    db.write({guild_id: json.dumps(guild) for guild_id, guild in servers.items()})
+    print(f"Migrated {len(servers)} guild(s)")
+
+    event_count = 0
+    for filename in sorted(os.listdir(events_backend.folder)):
+        if not filename.endswith(".json"):
+            continue
+        guild_id = filename[:-len(".json")]
+        events = events_backend.load_events(guild_id)
+        db.save_events(guild_id, events)
+        event_count += len(events)
+    print(f"Migrated {event_count} event(s)")
+    db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate bot data between storage layouts.")
+    parser.add_argument("target", choices=["shards", "sqlite"], help="The layout to migrate the JSON data to.")
+    parser.add_argument("--db", default=SQLITE_PATH, help="SQLite database path.")
+    args = parser.parse_args()
+    if args.target == "shards":
+        MigrateServersToShards(SERVERS_FILE)
+    elif args.target == "sqlite":
+        MigrateToSQLite(args.db)
@@ -1,15 +1,9 @@
 import os
-import json
 
 def EnsurePreReq():
     os.makedirs("data", exist_ok=True)
     os.makedirs("data/events", exist_ok=True)  # Ensure events folder exists
-
-    # Ensure servers.json exists
-    servers_path = "data/servers.json"
-    if not os.path.exists(servers_path):
-        with open(servers_path, "w") as f:
-            json.dump({}, f, indent=4)
+    os.makedirs("data/guilds", exist_ok=True)  # Per-guild config files + manifest.json
 
 
 
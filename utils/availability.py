@@ -0,0 +1,443 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from utils.constants import TIME_LABELS, AVAILABILITY_KEEP_WEEKS
+from utils.persist import WriteBehind, atomic_write
+
+AVAILABILITY_FOLDER = "data/availability"
+# A week is dropped once it ended more than this long ago
+DISCORD_EPOCH_MS = 1420070400000
+
+DAYS = 7
+SLOTS_PER_DAY = len(TIME_LABELS)
+WEEK_SLOTS = DAYS * SLOTS_PER_DAY
+MASK_BYTES = (WEEK_SLOTS + 7) // 8
+DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+
+def slot_bit(day, slot):
+    """Return the mask bit for one time slot on one day (Monday is day 0)."""
+    return 1 << (day * SLOTS_PER_DAY + slot)
+
+def day_slots(mask, day):
+    """Return the slot indexes set in **mask** for one day."""
+    bits = (mask >> (day * SLOTS_PER_DAY)) & DAY_MASK
+    return [slot for slot in range(SLOTS_PER_DAY) if bits >> slot & 1]
+
+def count_planes(masks):
+    """Add up many masks at once as a bit-sliced counter.
+
+    Plane ``i`` holds bit ``i`` of every slot's count, so each mask is added to
+    all **WEEK_SLOTS** counters with a handful of big-int operations (a ripple
+    carry across the planes) instead of a loop over slots.
+
+    Args:
+        masks (iterable[int]): One availability mask per member.
+
+    Returns:
+        list[int]: The count planes, least significant first.
+    """
+    planes = []
+    for carry in masks:
+        i = 0
+        while carry:
+            if i == len(planes):
+                planes.append(carry)
+                break
+            plane = planes[i]
+            planes[i] = plane ^ carry
+            carry &= plane
+            i += 1
+    return planes
+
+def slots_at_least(planes, k, width=WEEK_SLOTS):
+    """Return a mask of the slots whose count in **planes** is at least **k**."""
+    full = (1 << width) - 1
+    if k <= 0:
+        return full
+    # Compare every slot's count with k at once, most significant bit first
+    greater, equal = 0, full
+    for i in reversed(range(max(len(planes), k.bit_length()))):
+        plane = planes[i] if i < len(planes) else 0
+        if k >> i & 1:
+            equal &= plane
+        else:
+            greater |= equal & plane
+            equal &= ~plane
+    return (greater | equal) & full
+
+def plane_counts(planes, width=WEEK_SLOTS):
+    """Unpack count planes into one count per slot."""
+    return [sum((plane >> slot & 1) << i for i, plane in enumerate(planes)) for slot in range(width)]
+
+def message_bucket(message_id):
+    """Return the Monday (UTC, YYYY-MM-DD) of the week a Discord message was created.
+
+    The creation time is part of every message's snowflake ID, so this needs
+    no lookup.
+    """
+    created = datetime.fromtimestamp(((int(message_id) >> 22) + DISCORD_EPOCH_MS) / 1000, timezone.utc)
+    return (created - timedelta(days=created.weekday())).strftime("%Y-%m-%d")
+
+class WeekAvailability:
+    """Every member's availability for one team and week.
+
+    Member IDs are kept sorted in an ``array('Q')`` and their 7×N-slot masks
+    packed side by side in a ``bytearray``, **MASK_BYTES** each, so a week for
+    a full roster is a couple of hundred bytes. Bit ``day * N + slot`` is set
+    when the member is free for that slot.
+    """
+
+    __slots__ = ("users", "masks")
+
+    def __init__(self, users=None, masks=None):
+        self.users = users if users is not None else array('Q')
+        self.masks = masks if masks is not None else bytearray()
+
+    def __len__(self):
+        return len(self.users)
+
+    def _find(self, user_id):
+        i = bisect_left(self.users, user_id)
+        return i, i < len(self.users) and self.users[i] == user_id
+
+    def get(self, user_id):
+        """Return a member's mask, 0 if they haven't answered."""
+        i, found = self._find(int(user_id))
+        if not found:
+            return 0
+        return int.from_bytes(self.masks[i * MASK_BYTES:(i + 1) * MASK_BYTES], "little")
+
+    def set(self, user_id, mask):
+        """Replace a member's mask; a mask of 0 removes them.
+
+        Returns:
+            bool: True if anything changed.
+        """
+        user_id = int(user_id)
+        i, found = self._find(user_id)
+        start = i * MASK_BYTES
+        if not mask:
+            if not found:
+                return False
+            del self.users[i]
+            del self.masks[start:start + MASK_BYTES]
+            return True
+        packed = mask.to_bytes(MASK_BYTES, "little")
+        if found:
+            if self.masks[start:start + MASK_BYTES] == packed:
+                return False
+            self.masks[start:start + MASK_BYTES] = packed
+        else:
+            self.users.insert(i, user_id)
+            self.masks[start:start] = packed
+        return True
+
+    def items(self):
+        """Yield ``(user_id, mask)`` for every member who has answered."""
+        for i, user_id in enumerate(self.users):
+            yield user_id, int.from_bytes(self.masks[i * MASK_BYTES:(i + 1) * MASK_BYTES], "little")
+
+    def snapshot(self):
+        """Return an immutable copy of the packed data, for encoding off the event loop."""
+        return self.users.tobytes(), bytes(self.masks)
+
+    @staticmethod
+    def encode(snapshot):
+        users, masks = snapshot
+        return {
+            "users": base64.b64encode(users).decode("ascii"),
+            "masks": base64.b64encode(masks).decode("ascii")
+        }
+
+    @classmethod
+    def from_record(cls, record):
+        users = array('Q')
+        users.frombytes(base64.b64decode(record["users"]))
+        return cls(users, bytearray(base64.b64decode(record["masks"])))
+
+class AvailabilityStore:
+    """Members' weekly availability as one bitmask per member, team and week.
+
+    Alongside the weeks it keeps an index from each posted schedule message ID
+    to the team and week it was posted for, so a click or reaction on an old
+    message can be attributed after a restart. The index is split by the week
+    each message was created in (read from its ID) into
+    ``data/availability/messages/<week>.json``, so a lookup reads one small
+    file and the index is pruned along with the weeks.
+
+    Each team's week is its own file,
+    ``data/availability/weeks/<guild_id>/<week>_<team hash>.json``, holding
+    the member-ID array and packed masks base64 encoded. Weeks are read the
+    first time they are touched, and only weeks that changed are written,
+    encoded in a worker thread. **prune_past** drops weeks older than
+    **keep_weeks** (about a season by default), so nothing grows with the age
+    of the bot.
+    """
+
+    def __init__(self, folder=AVAILABILITY_FOLDER, keep_weeks=AVAILABILITY_KEEP_WEEKS, delay=0.25):
+        self.folder = folder
+        self.keep_weeks = keep_weeks
+        self.weeks_folder = os.path.join(folder, "weeks")
+        self.messages_folder = os.path.join(folder, "messages")
+        self._messages = {}
+        self._weeks = {}
+        self._counts = {}
+        self._listeners = []
+        self._flush_lock = asyncio.Lock()
+        self._dirty_weeks = set()
+        self._dirty_buckets = set()
+        self._writer = WriteBehind(self.flush, delay=delay)
+
+    @staticmethod
+    def week_key(guild_id, team_name, week):
+        return f"{guild_id}:{team_name.casefold()}:{week}"
+
+    @staticmethod
+    def split_week_key(key):
+        """Return ``(guild_id, case-folded team name, week)`` from a **week_key**."""
+        guild_id, rest = key.split(":", 1)
+        team_key, week = rest.rsplit(":", 1)
+        return guild_id, team_key, week
+
+    def get_week_file(self, key):
+        guild_id, team_key, week = self.split_week_key(key)
+        # Team names can hold any character, so files are named by a hash of the name
+        team_hash = hashlib.sha1(team_key.encode()).hexdigest()[:16]
+        return os.path.join(self.weeks_folder, guild_id, f"{week}_{team_hash}.json")
+
+    def _load_week(self, key):
+        if key not in self._weeks:
+            entry = None
+            file_path = self.get_week_file(key)
+            if os.path.exists(file_path):
+                with open(file_path, 'r') as f:
+                    record = json.load(f)
+                if record.get("slots_per_day", SLOTS_PER_DAY) != SLOTS_PER_DAY:
+                    print(f"Availability in {file_path} uses a different time slot grid; ignoring it")
+                else:
+                    entry = WeekAvailability.from_record(record)
+            self._weeks[key] = entry
+        return self._weeks[key]
+
+    def get_bucket_file(self, bucket):
+        return os.path.join(self.messages_folder, f"{bucket}.json")
+
+    def _load_bucket(self, bucket):
+        if bucket not in self._messages:
+            records = {}
+            file_path = self.get_bucket_file(bucket)
+            if os.path.exists(file_path):
+                with open(file_path, 'r') as f:
+                    records = json.load(f)
+            self._messages[bucket] = records
+        return self._messages[bucket]
+
+    def add_listener(self, listener):
+        """Call **listener(week_key)** whenever a member's availability for that team and week changes."""
+        self._listeners.append(listener)
+
+    def register_message(self, message_id, guild_id, team_name, week, day=None):
+        """Remember which team and week (and, for reaction mode, which day) a message belongs to."""
+        record = {"guild_id": str(guild_id), "team_name": team_name, "week": week}
+        if day is not None:
+            record["day"] = day
+        bucket = message_bucket(message_id)
+        self._load_bucket(bucket)[str(message_id)] = record
+        self._dirty_buckets.add(bucket)
+        self._save()
+
+    def lookup_message(self, message_id):
+        """Return the ``guild_id``/``team_name``/``week`` (and ``day``) for a schedule message, or None."""
+        return self._load_bucket(message_bucket(message_id)).get(str(message_id))
+
+    def week(self, guild_id, team_name, week):
+        """Return the WeekAvailability for a team and week, or None if nobody has answered."""
+        entry = self._load_week(self.week_key(guild_id, team_name, week))
+        return entry if entry else None
+
+    def get_mask(self, guild_id, team_name, week, user_id):
+        entry = self.week(guild_id, team_name, week)
+        return entry.get(user_id) if entry else 0
+
+    def set_mask(self, guild_id, team_name, week, user_id, mask):
+        """Replace a member's whole-week mask. Returns True if it changed."""
+        key = self.week_key(guild_id, team_name, week)
+        entry = self._load_week(key)
+        if entry is None:
+            if not mask:
+                return False
+            entry = self._weeks[key] = WeekAvailability()
+        counts = self._counts.get(key)
+        if counts is not None:
+            previous = entry.get(user_id)
+            self._apply_counts(counts, previous & ~mask, -1)
+            self._apply_counts(counts, mask & ~previous, 1)
+        changed = entry.set(user_id, mask)
+        if changed:
+            self._dirty_weeks.add(key)
+            self._save()
+            for listener in self._listeners:
+                listener(key)
+        return changed
+
+    def set_slot(self, guild_id, team_name, week, user_id, day, slot, available):
+        """Set or clear a single slot for a member. Returns True if it changed."""
+        mask = self.get_mask(guild_id, team_name, week, user_id)
+        bit = slot_bit(day, slot)
+        return self.set_mask(guild_id, team_name, week, user_id, mask | bit if available else mask & ~bit)
+
+    @staticmethod
+    def _apply_counts(counts, bits, delta):
+        while bits:
+            low = bits & -bits
+            counts[low.bit_length() - 1] += delta
+            bits ^= low
+
+    def slot_counts(self, guild_id, team_name, week):
+        """Return how many members are free in each slot of a team's week.
+
+        Counts are built from the masks on first use and kept up to date on
+        every change after that, so repeat reads are free.
+
+        Returns:
+            array: **WEEK_SLOTS** counts, indexed ``day * SLOTS_PER_DAY + slot``.
+        """
+        key = self.week_key(guild_id, team_name, week)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = array('I', bytes(4 * WEEK_SLOTS))
+            entry = self._load_week(key)
+            for _, mask in (entry.items() if entry else ()):
+                self._apply_counts(counts, mask, 1)
+        return counts
+
+    def get_day(self, guild_id, team_name, week, user_id, day):
+        """Return the slot indexes a member picked for one day (Monday is 0)."""
+        return day_slots(self.get_mask(guild_id, team_name, week, user_id), day)
+
+    def set_day(self, guild_id, team_name, week, user_id, day, slots):
+        """Replace a member's picked slots for one day.
+
+        Args:
+            guild_id (int | str): The guild/server ID.
+            team_name (str): The team's name.
+            week (str): The local date of the week's Monday (YYYY-MM-DD).
+            user_id (int): The member.
+            day (int): Day of the week, Monday is 0.
+            slots (list[int]): Indexes into the schedule's time slots.
+        """
+        mask = self.get_mask(guild_id, team_name, week, user_id)
+        mask &= ~(DAY_MASK << (day * SLOTS_PER_DAY))
+        for slot in slots:
+            mask |= slot_bit(day, slot)
+        return self.set_mask(guild_id, team_name, week, user_id, mask)
+
+    def get_week(self, guild_id, team_name, week, user_id):
+        """Return ``{day: [slot, ...]}`` for every day a member has answered."""
+        mask = self.get_mask(guild_id, team_name, week, user_id)
+        return {day: slots for day in range(DAYS) if (slots := day_slots(mask, day))}
+
+    @staticmethod
+    def _bucket_cutoff(week):
+        # A message is created at most a day before the Monday of the week it is
+        # for, so its bucket is at most a week earlier than that week
+        return (datetime.strptime(week, "%Y-%m-%d") - timedelta(days=7)).strftime("%Y-%m-%d")
+
+    def prune_before(self, week):
+        """Forget every week starting before **week** (YYYY-MM-DD), and its messages, in memory only."""
+        for key in [key for key in self._weeks if self.split_week_key(key)[2] < week]:
+            del self._weeks[key]
+            self._counts.pop(key, None)
+            self._dirty_weeks.discard(key)
+        bucket_cutoff = self._bucket_cutoff(week)
+        for bucket in [bucket for bucket in self._messages if bucket < bucket_cutoff]:
+            del self._messages[bucket]
+            self._dirty_buckets.discard(bucket)
+
+    def _remove_files_before(self, week):
+        removed = 0
+        if os.path.isdir(self.messages_folder):
+            bucket_cutoff = self._bucket_cutoff(week)
+            for name in os.listdir(self.messages_folder):
+                if name[:10] < bucket_cutoff:
+                    os.remove(os.path.join(self.messages_folder, name))
+        if not os.path.isdir(self.weeks_folder):
+            return removed
+        for guild_id in os.listdir(self.weeks_folder):
+            guild_folder = os.path.join(self.weeks_folder, guild_id)
+            # Files start with their week, so the past ones are found by name
+            for name in os.listdir(guild_folder):
+                if name[:10] < week:
+                    os.remove(os.path.join(guild_folder, name))
+                    removed += 1
+            if not os.listdir(guild_folder):
+                os.rmdir(guild_folder)
+        return removed
+
+    async def prune_past(self, now=None):
+        """Drop every week that ended more than **keep_weeks** weeks ago, from memory and disk.
+
+        Returns:
+            int: How many week files were removed.
+        """
+        now = now or datetime.now(timezone.utc)
+        cutoff = (now - timedelta(weeks=self.keep_weeks + 1)).strftime("%Y-%m-%d")
+        self.prune_before(cutoff)
+        async with self._flush_lock:
+            return await asyncio.to_thread(self._remove_files_before, cutoff)
+
+    def _save(self):
+        if not self._writer.schedule():
+            self.flush_sync()
+
+    def _snapshot(self):
+        """Copy what changed since the last write; the encoding happens in **_write**."""
+        weeks = {}
+        for key in self._dirty_weeks:
+            entry = self._weeks.get(key)
+            weeks[self.get_week_file(key)] = entry.snapshot() if entry else None
+        messages = {self.get_bucket_file(bucket): dict(self._messages[bucket]) for bucket in self._dirty_buckets}
+        self._dirty_weeks = set()
+        self._dirty_buckets = set()
+        return weeks, messages
+
+    @staticmethod
+    def _write(weeks, messages):
+        for file_path, snapshot in weeks.items():
+            if snapshot is None:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                continue
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            record = WeekAvailability.encode(snapshot)
+            record["slots_per_day"] = SLOTS_PER_DAY
+            atomic_write(file_path, json.dumps(record, separators=(",", ":")))
+        for file_path, records in messages.items():
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            atomic_write(file_path, json.dumps(records, separators=(",", ":")))
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._dirty_weeks and not self._dirty_buckets:
+                return False
+            dirty_weeks, dirty_buckets = set(self._dirty_weeks), set(self._dirty_buckets)
+            weeks, messages = self._snapshot()
+            try:
+                await asyncio.to_thread(self._write, weeks, messages)
+            except Exception:
+                self._dirty_weeks |= dirty_weeks
+                self._dirty_buckets |= dirty_buckets
+                raise
+            return bool(self._dirty_weeks or self._dirty_buckets)
+
+    def flush_sync(self):
+        if not self._dirty_weeks and not self._dirty_buckets:
+            return
+        self._write(*self._snapshot())
+
+availability_store = AvailabilityStore()
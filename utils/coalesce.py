@@ -0,0 +1,48 @@
+import asyncio
+
+class RefreshCoalescer:
+    """Run a refresh per key at most once every **window** seconds.
+
+    **mark(key, refresh)** records that something under **key** changed. The
+    first mark refreshes straight away; marks arriving inside the window only
+    replace the pending refresh, which runs once when the window ends. The
+    refresh reads live state when it runs, so it always shows the latest
+    change and the number of refreshes depends on time, not on how many
+    marks came in.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._pending = {}
+        self._tasks = {}
+
+    def mark(self, key, refresh):
+        """Queue **refresh** (an async callable taking no arguments) for **key**."""
+        self._pending[key] = refresh
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._run(key))
+
+    async def _run(self, key):
+        # Stays alive for a window after each refresh to absorb the next marks
+        try:
+            while key in self._pending:
+                await self._call(key, self._pending.pop(key))
+                await asyncio.sleep(self.window)
+        finally:
+            if self._tasks.get(key) is asyncio.current_task():
+                del self._tasks[key]
+
+    @staticmethod
+    async def _call(key, refresh):
+        try:
+            await refresh()
+        except Exception as e:
+            print(f"Refresh for {key} failed: {e}")
+
+    async def flush(self):
+        """Run every pending refresh now, e.g. before shutting down."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        pending, self._pending = self._pending, {}
+        await asyncio.gather(*(self._call(key, refresh) for key, refresh in pending.items()))
@@ -59,4 +59,28 @@ TIMEZONE_MAP = {
     "Brisbane": "Australia/Brisbane",
     "Perth": "Australia/Perth",
     "Jakarta": "Asia/Jakarta"
-}
\ No newline at end of file
+}
+
+# Per-team "schedule_mode": a message per day with number reactions, or one grid message
+REACTION_MODE = "reactions"
+GRID_MODE = "grid"
+SCHEDULE_MODES = [REACTION_MODE, GRID_MODE]
+
+# Daily time slots on the weekly schedule; availability masks have 7 * len(TIME_LABELS) bits
+TIME_LABELS = [
+    "1 PM", "2 PM", "3 PM", "4 PM", "5 PM", "6 PM", "7 PM", "8 PM",
+    "9 PM", "10 PM"
+]
+
+# Storage backend: "json" (per-guild files under data/) or "sqlite"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/bot.db")
+
+# Minimum gap between edits of one event's RSVP embed; clicks in between are batched
+EMBED_REFRESH_SECONDS = float(os.getenv("EMBED_REFRESH_SECONDS", "2"))
+
+# Events that started more than this many days ago move to data/events/archive
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+
+# Weeks of availability answers kept (about a season) before they are deleted
+AVAILABILITY_KEEP_WEEKS = int(os.getenv("AVAILABILITY_KEEP_WEEKS", "26"))
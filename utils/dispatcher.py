@@ -0,0 +1,64 @@
+import asyncio
+import time
+import weakref
+
+DISPATCH_CONCURRENCY = 8
+
+class Dispatcher:
+    """Run many channel sends concurrently without flooding the API.
+
+    At most **concurrency** sends are in flight at once across all channels,
+    and sends that target the same channel run one after another, so they share
+    that channel's rate-limit bucket politely and their messages never
+    interleave. discord.py still handles the actual 429 back-off per route.
+    """
+
+    def __init__(self, concurrency=DISPATCH_CONCURRENCY):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._channel_locks = weakref.WeakValueDictionary()
+
+    def _channel_lock(self, channel_id):
+        lock = self._channel_locks.get(channel_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._channel_locks[channel_id] = lock
+        return lock
+
+    async def _run_one(self, channel_id, send):
+        # Wait for the channel first so a busy channel doesn't hold a global slot
+        async with self._channel_lock(channel_id):
+            async with self._semaphore:
+                start = time.monotonic()
+                try:
+                    await send()
+                except Exception as e:
+                    print(f"Dispatch to channel {channel_id} failed: {e}")
+                    return False, time.monotonic() - start
+                return True, time.monotonic() - start
+
+    async def dispatch(self, label, sends):
+        """Run a batch of sends and report how long it took.
+
+        Args:
+            label (str): Name for the batch in the report.
+            sends (list[tuple[int, callable]]): ``(channel_id, send)`` pairs, where
+                **send** is an async callable taking no arguments.
+
+        Returns:
+            dict: ``sent``, ``failed``, total ``seconds`` and ``slowest`` single send.
+        """
+        if not sends:
+            return {"sent": 0, "failed": 0, "seconds": 0.0, "slowest": 0.0}
+        start = time.monotonic()
+        results = await asyncio.gather(*(self._run_one(channel_id, send) for channel_id, send in sends))
+        report = {
+            "sent": sum(1 for ok, _ in results if ok),
+            "failed": sum(1 for ok, _ in results if not ok),
+            "seconds": time.monotonic() - start,
+            "slowest": max(elapsed for _, elapsed in results)
+        }
+        print(
+            f"[{label}] {report['sent']}/{len(sends)} sent in {report['seconds']:.1f}s "
+            f"(slowest {report['slowest']:.1f}s, {report['failed']} failed)"
+        )
+        return report
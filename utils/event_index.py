@@ -0,0 +1,77 @@
+from bisect import bisect_left, insort
+
+class UpcomingEventIndex:
+    """Events sorted by start time, per guild and per guild and team.
+
+    Each list holds ``(start_timestamp, message_id)`` pairs, so the events
+    after a moment are found by bisection and a page costs
+    O(log n + page size) however many events the guild has had. Built from
+    the upcoming events at startup and kept current through the EventStore's
+    listener.
+    """
+
+    def __init__(self):
+        self._by_guild = {}
+        self._by_team = {}
+        self._entries = {}
+        self._states = {}
+
+    @staticmethod
+    def _team_key(guild_id, team_name):
+        return (str(guild_id), (team_name or "").casefold())
+
+    def add(self, state):
+        """Index an event, or re-index it if its start time or team changed."""
+        start = state.start
+        key = (state.guild_id, state.message_id)
+        placed = (start.timestamp() if start else None, state.get("team_name", ""))
+        if self._entries.get(key) == placed:
+            return
+        self.remove(state)
+        if start is None:
+            return
+        entry = (start.timestamp(), state.message_id)
+        insort(self._by_guild.setdefault(state.guild_id, []), entry)
+        insort(self._by_team.setdefault(self._team_key(state.guild_id, placed[1]), []), entry)
+        self._entries[key] = placed
+        self._states[key] = state
+
+    def add_all(self, states):
+        for state in states:
+            self.add(state)
+
+    def remove(self, state):
+        key = (state.guild_id, state.message_id)
+        placed = self._entries.pop(key, None)
+        self._states.pop(key, None)
+        if placed is None:
+            return
+        entry = (placed[0], state.message_id)
+        for entries in (self._by_guild.get(state.guild_id), self._by_team.get(self._team_key(state.guild_id, placed[1]))):
+            if entries:
+                i = bisect_left(entries, entry)
+                if i < len(entries) and entries[i] == entry:
+                    del entries[i]
+
+    def page(self, guild_id, after, team_name=None, page=0, per_page=5):
+        """Return one page of events starting at or after **after**.
+
+        Args:
+            guild_id (int | str): The guild/server ID.
+            after (datetime): Only events starting at or after this are listed.
+            team_name (str, optional): Only list this team's events.
+            page (int, optional): Zero-based page number.
+            per_page (int, optional): Events per page.
+
+        Returns:
+            tuple[list[EventState], int]: The page's events, soonest first, and
+            how many upcoming events there are in total.
+        """
+        if team_name is None:
+            entries = self._by_guild.get(str(guild_id), [])
+        else:
+            entries = self._by_team.get(self._team_key(guild_id, team_name), [])
+        first = bisect_left(entries, (after.timestamp(),))
+        start = first + page * per_page
+        states = [self._states[(str(guild_id), message_id)] for _, message_id in entries[start:start + per_page]]
+        return states, len(entries) - first
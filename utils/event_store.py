@@ -0,0 +1,239 @@
+import asyncio
+import copy
+import threading
+from collections import deque
+from utils.persist import WriteBehind
+from utils.storage import RSVP_KEYS, EventArchive, event_start, get_event_backend
+
+class EventState:
+    """Live state of one event message.
+
+    RSVPs are held as one insertion-ordered set per status (a dict with no
+    values) plus a reverse map from user to status, so moving a user between
+    lists is O(1) and the lists still show in sign-up order.
+    """
+
+    __slots__ = ("guild_id", "message_id", "data", "members", "status_of")
+
+    def __init__(self, guild_id, message_id, event_data):
+        self.guild_id = str(guild_id)
+        self.message_id = str(message_id)
+        self.data = {key: value for key, value in event_data.items() if key not in RSVP_KEYS}
+        self.members = {key: dict.fromkeys(event_data.get(key, [])) for key in RSVP_KEYS}
+        self.status_of = {user_id: key for key in RSVP_KEYS for user_id in self.members[key]}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    @property
+    def start(self):
+        """The event's start as an aware datetime, or None."""
+        return event_start(self.data)
+
+    def set_status(self, user_id, status):
+        """Move a user into one RSVP set, or out of all of them with None.
+
+        Returns:
+            str | None: The user's previous status.
+        """
+        previous = self.status_of.pop(user_id, None)
+        if previous is not None:
+            del self.members[previous][user_id]
+        if status is not None:
+            self.members[status][user_id] = None
+            self.status_of[user_id] = status
+        return previous
+
+    def to_dict(self):
+        """Return the event in its stored shape, with RSVPs as lists."""
+        event_data = dict(self.data)
+        for key in RSVP_KEYS:
+            event_data[key] = list(self.members[key])
+        return event_data
+
+class EventStore:
+    """In-memory events in front of the event backend.
+
+    Events are loaded from the backend the first time they are touched and
+    kept. An RSVP only updates memory and queues the change; queued changes
+    are written to the backend in order shortly afterwards, in a worker
+    thread, so a click never waits on disk. Backend access from the event
+    loop and from that thread is serialised by one lock.
+    """
+
+    def __init__(self, backend=None, archive=None, delay=0.25):
+        self._backend = backend
+        self.archive = archive or EventArchive()
+        self._events = {}
+        self._pending = deque()
+        self._listeners = []
+        self._remove_listeners = []
+        self._flush_lock = asyncio.Lock()
+        self._backend_lock = threading.RLock()
+        self._writer = WriteBehind(self.flush, delay=delay)
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = get_event_backend()
+        return self._backend
+
+    def get(self, guild_id, message_id):
+        """Return the EventState for an event message, or None if it isn't an event."""
+        key = (str(guild_id), str(message_id))
+        state = self._events.get(key)
+        if state is None:
+            with self._backend_lock:
+                event_data = self.backend.load_event(*key)
+            if event_data is None:
+                return None
+            state = self._events[key] = EventState(*key, event_data)
+        return state
+
+    def add_listener(self, listener):
+        """Call **listener(state)** whenever an event is created or its details change."""
+        self._listeners.append(listener)
+
+    def add_remove_listener(self, listener):
+        """Call **listener(state)** whenever an event is moved out of the live store."""
+        self._remove_listeners.append(listener)
+
+    def _notify(self, state):
+        for listener in self._listeners:
+            listener(state)
+
+    def create(self, guild_id, message_id, event_data):
+        """Store a new event straight away and return its EventState."""
+        key = (str(guild_id), str(message_id))
+        with self._backend_lock:
+            self.backend.save_event(*key, event_data)
+        state = self._events[key] = EventState(*key, event_data)
+        self._notify(state)
+        return state
+
+    async def update(self, state, **fields):
+        """Change an event's details (not its RSVPs) and write it in a worker thread."""
+        state.data.update(fields)
+        async with self._flush_lock:
+            # RSVPs queued before the copy go first so the full write can't be
+            # overtaken by older ones; later ones are written after it
+            queued = len(self._pending)
+            event_data = state.to_dict()
+            await asyncio.to_thread(self._save_after_pending, queued, state.guild_id, state.message_id, event_data)
+        self._notify(state)
+
+    def _save_after_pending(self, queued, guild_id, message_id, event_data):
+        with self._backend_lock:
+            self._write_pending(queued)
+            self.backend.save_event(guild_id, message_id, event_data)
+
+    async def load_upcoming(self, since):
+        """Load every event starting at or after **since** and return their EventStates."""
+        events = await asyncio.to_thread(self._read_upcoming, since)
+        states = []
+        for guild_id, message_id, event_data in events:
+            key = (str(guild_id), str(message_id))
+            state = self._events.get(key)
+            if state is None:
+                state = self._events[key] = EventState(*key, event_data)
+            states.append(state)
+        return states
+
+    def _read_upcoming(self, since):
+        with self._backend_lock:
+            return list(self.backend.iter_events(since))
+
+    def rsvp(self, guild_id, message_id, user_id, status):
+        """Apply one RSVP change in memory and queue it for the backend.
+
+        Args:
+            guild_id (int | str): The guild the event belongs to.
+            message_id (int | str): The event message.
+            user_id (int): The user RSVPing.
+            status (str | None): One of **RSVP_KEYS**, or None to remove the user.
+
+        Returns:
+            tuple[EventState | None, str | None]: The event and the user's previous
+            status, or ``(None, None)`` if the message isn't a live event.
+        """
+        state = self.get(guild_id, message_id)
+        if state is None:
+            # Unknown or archived: never create a stub that would stay in the live store
+            return None, None
+        previous = state.set_status(user_id, status)
+        if previous != status:
+            self._pending.append((state.guild_id, state.message_id, user_id, status))
+            if not self._writer.schedule():
+                self.flush_sync()
+        return state, previous
+
+    async def archive_past(self, before):
+        """Move every event that started before **before** into the monthly archives.
+
+        Guilds are archived one at a time, yielding to the event loop in
+        between, and queued RSVPs are written first so none land on an
+        archived event.
+
+        Returns:
+            int: How many events were archived.
+        """
+        await self.flush()
+        count = 0
+        with self._backend_lock:
+            guild_ids = self.backend.event_guild_ids()
+        for guild_id in guild_ids:
+            moved = await asyncio.to_thread(self._archive_guild, guild_id, before)
+            for message_id in moved:
+                state = self._events.pop((str(guild_id), str(message_id)), None)
+                if state is not None:
+                    for listener in self._remove_listeners:
+                        listener(state)
+                count += 1
+        return count
+
+    def _archive_guild(self, guild_id, before):
+        with self._backend_lock:
+            return self.backend.archive_events(guild_id, before, self.archive)
+
+    def live_events(self, guild_id):
+        """Return a deep copy of a guild's live events as ``(message_id, event_data)`` pairs.
+
+        The backend's own dicts keep changing as queued RSVPs are written from
+        the worker thread, so anything read outside the lock works on a copy.
+        """
+        with self._backend_lock:
+            return [(message_id, copy.deepcopy(event_data)) for message_id, event_data in self.backend.load_events(guild_id).items()]
+
+    def archived_events(self, guild_id, month):
+        """Return ``{message_id: event_data}`` for a guild's archived events in one month (YYYY-MM)."""
+        return self.archive.load_month(guild_id, month)
+
+    def archived_months(self, guild_id):
+        return self.archive.months(guild_id)
+
+    def _write_pending(self, limit=None):
+        # Drop each change only once it is written, so a failed write is retried
+        with self._backend_lock:
+            written = 0
+            while self._pending and (limit is None or written < limit):
+                self.backend.record_rsvp(*self._pending[0])
+                self._pending.popleft()
+                written += 1
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return False
+            # Journal appends, compactions and SQLite writes all stay off the event loop
+            await asyncio.to_thread(self._write_pending)
+            return bool(self._pending)
+
+    def flush_sync(self):
+        if self._pending:
+            self._write_pending()
+
+    def compact_all(self):
+        with self._backend_lock:
+            self.backend.compact_all()
+
+event_store = EventStore()
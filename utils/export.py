@@ -0,0 +1,129 @@
+import csv
+import io
+import tempfile
+from datetime import datetime, timezone
+from utils.storage import RSVP_KEYS, event_start
+
+CSV_HEADER = ["event_id", "event_name", "team_name", "start_utc", "user_id", "status"]
+ICS_LINE_OCTETS = 75
+SPOOL_MAX_BYTES = 1024 * 1024  # Exports bigger than this spill to a temporary file on disk
+
+def sort_by_start(events):
+    return sorted(events, key=lambda item: event_start(item[1]) or datetime.max.replace(tzinfo=timezone.utc))
+
+def iter_guild_events(store, guild_id, live_events, team_name=None):
+    """Yield ``(message_id, event_data)`` for a guild's events, oldest first.
+
+    Archived months are read one at a time and let go before the next, then
+    the live events follow, so at most one month of history is held at once
+    however long the guild has been running.
+
+    Args:
+        store (EventStore): The event store, for its archive.
+        guild_id (int | str): The guild/server ID.
+        live_events (list[tuple[str, dict]]): The guild's live events.
+        team_name (str, optional): Only yield this team's events.
+    """
+    def team_events(events):
+        for message_id, event_data in events:
+            if team_name is None or event_data.get("team_name", "").casefold() == team_name.casefold():
+                yield message_id, event_data
+
+    for month in store.archived_months(guild_id):
+        yield from team_events(sort_by_start(store.archived_events(guild_id, month).items()))
+    yield from team_events(sort_by_start(live_events))
+
+def csv_rows(events):
+    """Yield the CSV header, then one row per RSVP (or one blank row for an event without any)."""
+    yield CSV_HEADER
+    for message_id, event_data in events:
+        start = event_start(event_data)
+        event = [
+            message_id,
+            event_data.get("event_name", ""),
+            event_data.get("team_name", ""),
+            start.astimezone(timezone.utc).isoformat() if start else ""
+        ]
+        signed_up = False
+        for status in RSVP_KEYS:
+            for user_id in event_data.get(status, []):
+                signed_up = True
+                yield event + [user_id, status]
+        if not signed_up:
+            yield event + ["", ""]
+
+def iter_csv(rows):
+    """Encode rows as CSV text, one row at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def ics_escape(text):
+    return str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def ics_fold(line):
+    """Fold a content line at 75 octets, as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= ICS_LINE_OCTETS:
+        return line
+    parts, current, size = [], "", 0
+    for char in line:
+        char_size = len(char.encode())
+        # Continuation lines start with a space, which counts towards their 75
+        if size + char_size > (ICS_LINE_OCTETS if not parts else ICS_LINE_OCTETS - 1):
+            parts.append(current)
+            current, size = "", 0
+        current += char
+        size += char_size
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+def ics_time(dt):
+    return dt.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def ics_lines(events, calendar_name):
+    """Yield the lines of an iCalendar file with one VEVENT per event."""
+    stamp = ics_time(datetime.now(timezone.utc))
+    yield "BEGIN:VCALENDAR"
+    yield "VERSION:2.0"
+    yield "PRODID:-//comp-sched-bot//Events//EN"
+    yield "CALSCALE:GREGORIAN"
+    yield f"X-WR-CALNAME:{ics_escape(calendar_name)}"
+    for message_id, event_data in events:
+        start = event_start(event_data)
+        if start is None:
+            continue
+        counts = ", ".join(f"{status}: {len(event_data.get(status, []))}" for status in RSVP_KEYS)
+        description = f"Team: {event_data.get('team_name', '')}\nRSVPs: {counts}"
+        yield "BEGIN:VEVENT"
+        yield f"UID:{message_id}@comp-sched-bot"
+        yield f"DTSTAMP:{stamp}"
+        yield f"DTSTART:{ics_time(start)}"
+        yield f"SUMMARY:{ics_escape(event_data.get('event_name', 'Event'))}"
+        yield f"DESCRIPTION:{ics_escape(description)}"
+        yield "END:VEVENT"
+    yield "END:VCALENDAR"
+
+def iter_ics(lines):
+    for line in lines:
+        yield ics_fold(line) + "\r\n"
+
+def spool(chunks):
+    """Write text chunks to a spooled temporary file and return it rewound.
+
+    The file stays in memory while small and moves to disk past
+    **SPOOL_MAX_BYTES**, so an export never holds more than that in memory.
+
+    Returns:
+        tuple[SpooledTemporaryFile, int]: The file and how many bytes were written.
+    """
+    fp = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    size = 0
+    for chunk in chunks:
+        size += fp.write(chunk.encode())
+    fp.seek(0)
+    return fp, size
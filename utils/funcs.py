@@ -1,8 +1,9 @@
 import json
-from os import path
+from utils.permissions import permission_index
+from utils.log_pipeline import log_pipeline
 
 def CheckIfBotChannel(channel_id, guild_id):
-    """Check the Server JSON to see if the given channel ID is a bot channel.
+    """Check the server config to see if the given channel ID is a bot channel.
 
     Args:
         channel_id (int): Channel ID that command was ran in.
@@ -11,17 +12,10 @@ def CheckIfBotChannel(channel_id, guild_id):
     Returns:
         bool: If the channel is a bot channel (True) or not (False).
     """
-    filename = "data/servers.json"
-    if not path.exists(filename):
-        return False
-    data = ReadJSON(filename)
-    if str(guild_id) in data:
-        return str(channel_id) in data[str(guild_id)]["bot_channels"]
-    else:
-        return False
+    return permission_index.is_bot_channel(channel_id, guild_id)
 
 def CheckIfAdminRole(role_ids, guild_id):
-    """Check the Server JSON to see if any of the given role IDs are admin roles.
+    """Check the server config to see if any of the given role IDs are admin roles.
 
     Args:
         role_ids (array[int]): The role ID's of the user to check.
@@ -30,15 +24,7 @@ def CheckIfAdminRole(role_ids, guild_id):
     Returns:
         bool: The result of the check (True if any role ID is an admin role, False otherwise).
     """
-    filename = "data/servers.json"
-    if not path.exists(filename):
-        return False
-    data = ReadJSON(filename)
-    if str(guild_id) in data:
-        for role_id in role_ids:
-            if str(role_id) in data[str(guild_id)]["admin_roles"]:
-                return True
-    return False
+    return permission_index.is_admin(role_ids, guild_id)
 
 def ReadJSON(filename):
     """Read a **JSON** file and **return** the data.
@@ -64,34 +50,21 @@ def WriteJSON(data, filename, indent=4):
         json.dump(data, f, indent=indent)
         
 def CheckIfTeamCaptain(role_ids, guild_id, team_name):
-    """Check the Server JSON to see if any of the given role IDs are team captain roles.
+    """Check the server config to see if any of the given role IDs are team captain roles.
 
     Args:
         role_ids (array[int]): The role ID's of the user to check.
         guild_id (int): The guild/server ID to check.
         team_name (str): The name of the team to check."""
-    filename = "data/servers.json"
-    if not path.exists(filename):
-        return False
-    data = ReadJSON(filename)
-    if str(guild_id) in data:
-        teams = data[str(guild_id)].get("teams", [])
-        for team in teams:
-            if team.get("team_name") == team_name:
-                for role_id in role_ids:
-                    if team.get("team_cap_role") == role_id:
-                        return True
-    return False
+    return permission_index.is_team_captain(role_ids, guild_id, team_name)
 
 async def log_to_discord(bot, guild_id, message):
-    """Send a log message to the bot_logs_channel for the given guild."""
-    data = ReadJSON("data/servers.json")
-    channel_id = data.get(str(guild_id), {}).get("bot_logs_channel")
-    if channel_id:
-        guild = bot.get_guild(int(guild_id))
-        if guild:
-            channel = guild.get_channel(int(channel_id))
-            if channel:
-                await channel.send(f"[LOG] {message}")
-                return True
-    return False
\ No newline at end of file
+    """Queue a log message for the bot_logs_channel of the given guild.
+
+    Lines are batched and sent in the background by the log pipeline, so this
+    returns straight away.
+
+    Returns:
+        bool: If the guild has a log channel set (True) or not (False).
+    """
+    return log_pipeline.submit(bot, guild_id, message)
\ No newline at end of file
@@ -0,0 +1,181 @@
+import asyncio
+import atexit
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from utils.persist import WriteBehind, atomic_write
+
+JOBS_FILE = "data/schedule_jobs.json"  # Single-file layout, split into JOBS_FOLDER on first load
+JOBS_FOLDER = "data/schedule_jobs"
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+EXPIRED = "expired"
+INTERRUPTED = "interrupted"
+
+class JobQueue:
+    """Persisted queue of weekly schedule sends.
+
+    Each job is keyed by guild, team and week, so asking for the same send
+    twice (a restart, a catch-up pass racing the live scheduler) always finds
+    the existing job and its state instead of sending again. Jobs are kept in
+    one ``data/schedule_jobs/<week>.json`` file per week and only the weeks
+    that changed are rewritten, behind like the ServerStore: the changed jobs
+    are copied on the event loop and encoded and written in a worker thread.
+    Weeks older than **keep_weeks** with nothing left pending are deleted
+    whenever a new week starts. The states around an actual send go through
+    **commit_state**, so a job found as sending after a restart was cut off
+    mid-send and is not sent again.
+    """
+
+    def __init__(self, folder=JOBS_FOLDER, keep_weeks=8, delay=0.25, legacy_file=JOBS_FILE):
+        self.folder = folder
+        self.legacy_file = legacy_file
+        self.keep_weeks = keep_weeks
+        self._weeks = None
+        self._dirty_weeks = set()
+        self._flush_lock = asyncio.Lock()
+        self._exit_flush = False
+        self._writer = WriteBehind(self.flush, delay=delay)
+
+    def get_week_file(self, week):
+        return os.path.join(self.folder, f"{week}.json")
+
+    def _load(self):
+        if self._weeks is None:
+            self._weeks = {}
+            if os.path.isdir(self.folder):
+                for name in os.listdir(self.folder):
+                    if name.endswith(".json"):
+                        with open(os.path.join(self.folder, name), 'r') as f:
+                            self._weeks[name[:-len(".json")]] = json.load(f)
+            if self.legacy_file and os.path.exists(self.legacy_file):
+                self._migrate_legacy()
+            self.prune()
+        return self._weeks
+
+    def _migrate_legacy(self):
+        with open(self.legacy_file, 'r') as f:
+            jobs = json.load(f)
+        for key, job in jobs.items():
+            self._weeks.setdefault(job["week"], {}).setdefault(key, job)
+            self._dirty_weeks.add(job["week"])
+        # Written out before the old file goes, so nothing is lost to a crash in between
+        self._write(self._snapshot())
+        os.remove(self.legacy_file)
+
+    @staticmethod
+    def job_key(guild_id, team_name, week):
+        return f"{guild_id}:{team_name.casefold()}:{week}"
+
+    def get(self, guild_id, team_name, week):
+        return self._load().get(week, {}).get(self.job_key(guild_id, team_name, week))
+
+    def enqueue(self, guild_id, team_name, week, due):
+        """Return the job for this team and week, creating it as pending if new.
+
+        Args:
+            guild_id (int | str): The guild/server ID.
+            team_name (str): The team's name.
+            week (str): The local date of the week's Monday (YYYY-MM-DD).
+            due (datetime): When the send was planned for.
+
+        Returns:
+            dict: The job.
+        """
+        weeks = self._load()
+        key = self.job_key(guild_id, team_name, week)
+        if week not in weeks:
+            weeks[week] = {}
+            self.prune()
+        jobs = weeks[week]
+        job = jobs.get(key)
+        if job is None:
+            job = jobs[key] = {
+                "key": key,
+                "guild_id": str(guild_id),
+                "team_name": team_name,
+                "week": week,
+                "due": due.astimezone(timezone.utc).isoformat(),
+                "state": PENDING
+            }
+            self._save(week)
+        return job
+
+    def set_state(self, job, state):
+        job["state"] = state
+        job["updated_at"] = datetime.now(timezone.utc).isoformat()
+        self._save(job["week"])
+
+    async def commit_state(self, job, state):
+        """Set a job's state and wait until it is written to disk."""
+        self.set_state(job, state)
+        await self.flush()
+
+    def in_state(self, state):
+        """Return every job in **state**, oldest due time first."""
+        return sorted(
+            (job for jobs in self._load().values() for job in jobs.values() if job["state"] == state),
+            key=lambda job: job["due"]
+        )
+
+    def pending(self):
+        """Return every pending job, oldest due time first."""
+        return self.in_state(PENDING)
+
+    def prune(self):
+        """Forget weeks older than **keep_weeks** once none of their jobs is pending."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(weeks=self.keep_weeks)).strftime("%Y-%m-%d")
+        for week, jobs in list(self._weeks.items()):
+            if week < cutoff and all(job["state"] != PENDING for job in jobs.values()):
+                # An empty week is deleted from disk by the next write
+                del self._weeks[week]
+                self._dirty_weeks.add(week)
+
+    def _save(self, week):
+        self._dirty_weeks.add(week)
+        if self._writer.schedule():
+            return
+        # No event loop (e.g. a script): write once at exit rather than on every change
+        if not self._exit_flush:
+            self._exit_flush = True
+            atexit.register(self.flush_sync)
+
+    def _snapshot(self):
+        """Copy the changed weeks' jobs; the encoding happens in **_write**."""
+        weeks = {}
+        for week in self._dirty_weeks:
+            jobs = self._weeks.get(week)
+            weeks[self.get_week_file(week)] = {key: dict(job) for key, job in jobs.items()} if jobs is not None else None
+        self._dirty_weeks = set()
+        return weeks
+
+    def _write(self, weeks):
+        os.makedirs(self.folder, exist_ok=True)
+        for file_path, jobs in weeks.items():
+            if jobs is None:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                continue
+            atomic_write(file_path, json.dumps(jobs, separators=(",", ":")))
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._dirty_weeks:
+                return False
+            dirty = set(self._dirty_weeks)
+            snapshot = self._snapshot()
+            try:
+                await asyncio.to_thread(self._write, snapshot)
+            except Exception:
+                self._dirty_weeks |= dirty
+                raise
+            return bool(self._dirty_weeks)
+
+    def flush_sync(self):
+        if self._weeks is None or not self._dirty_weeks:
+            return
+        self._write(self._snapshot())
+
+job_queue = JobQueue()
@@ -0,0 +1,24 @@
+import asyncio
+import weakref
+
+# Locks are only weakly held: once no coroutine holds or waits on a guild's
+# lock it is garbage collected, so idle guilds cost nothing.
+_guild_locks = weakref.WeakValueDictionary()
+
+def guild_lock(guild_id):
+    """Return the lock that serialises read-modify-write of one guild's state.
+
+    Usage: ``async with guild_lock(guild_id): ...``
+
+    Args:
+        guild_id (int | str): The guild/server ID.
+
+    Returns:
+        asyncio.Lock: The same lock object for as long as anyone is using it.
+    """
+    key = str(guild_id)
+    lock = _guild_locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _guild_locks[key] = lock
+    return lock
@@ -0,0 +1,95 @@
+import asyncio
+from collections import deque
+from utils.server_store import server_store
+
+MESSAGE_LIMIT = 2000
+LOG_PREFIX = "[LOG] "
+
+def pack_lines(lines, limit=MESSAGE_LIMIT):
+    """Join lines into as few messages of at most **limit** characters as possible."""
+    messages, current = [], ""
+    for line in lines:
+        line = line if len(line) <= limit else line[:limit - 3] + "..."
+        if current and len(current) + 1 + len(line) > limit:
+            messages.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        messages.append(current)
+    return messages
+
+class LogPipeline:
+    """Batch guild log lines into as few Discord messages as possible.
+
+    **submit** only appends to the guild's buffer and returns. A background
+    task wakes every **interval** seconds and sends each guild's buffered
+    lines packed into messages of at most 2000 characters. A guild's buffer
+    holds at most **max_lines**; past that the oldest lines are dropped and
+    the next batch starts with a note of how many were lost.
+    """
+
+    def __init__(self, interval=3.0, max_lines=200):
+        self.interval = interval
+        self.max_lines = max_lines
+        self.bot = None
+        self._buffers = {}
+        self._dropped = {}
+        self._task = None
+
+    def submit(self, bot, guild_id, message):
+        """Queue one log line for a guild.
+
+        Returns:
+            bool: False if the guild has no log channel set, so nothing was queued.
+        """
+        guild_id = str(guild_id)
+        if not server_store.get(guild_id, {}).get("bot_logs_channel"):
+            return False
+        self.bot = bot
+        buffer = self._buffers.setdefault(guild_id, deque())
+        if len(buffer) >= self.max_lines:
+            buffer.popleft()
+            self._dropped[guild_id] = self._dropped.get(guild_id, 0) + 1
+        buffer.append(f"{LOG_PREFIX}{message}")
+        self._start()
+        return True
+
+    def _start(self):
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                # No loop yet (e.g. called from a script); nothing to send with anyway
+                pass
+
+    async def _run(self):
+        while self._buffers:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        """Send everything buffered now."""
+        buffers, self._buffers = self._buffers, {}
+        dropped, self._dropped = self._dropped, {}
+        await asyncio.gather(*(
+            self._send(guild_id, lines, dropped.get(guild_id, 0))
+            for guild_id, lines in buffers.items()
+        ))
+
+    async def _send(self, guild_id, lines, dropped):
+        channel_id = server_store.get(guild_id, {}).get("bot_logs_channel")
+        guild = self.bot.get_guild(int(guild_id)) if self.bot and channel_id else None
+        channel = guild.get_channel(int(channel_id)) if guild else None
+        if not channel:
+            return
+        if dropped:
+            lines.appendleft(f"{LOG_PREFIX}({dropped} older log line(s) dropped while the log was busy)")
+        for content in pack_lines(lines):
+            try:
+                await channel.send(content)
+            except Exception as e:
+                print(f"Failed to send logs to guild {guild_id}: {e}")
+                return
+
+log_pipeline = LogPipeline()
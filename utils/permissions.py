@@ -0,0 +1,63 @@
+from utils.server_store import server_store
+
+class _GuildPermissions:
+    __slots__ = ("admin_roles", "bot_channels", "captain_roles")
+
+    def __init__(self, guild):
+        self.admin_roles = frozenset(str(role_id) for role_id in guild.get("admin_roles", []))
+        self.bot_channels = frozenset(str(channel_id) for channel_id in guild.get("bot_channels", []))
+        self.captain_roles = {}
+        for team in guild.get("teams", []):
+            cap_role = team.get("team_cap_role")
+            if cap_role is not None:
+                self.captain_roles.setdefault(str(cap_role), set()).add(team.get("team_name"))
+
+class PermissionIndex:
+    """Per-guild sets of admin roles, bot channels and captain roles.
+
+    Built lazily from the ServerStore and dropped whenever a guild's config is
+    saved, so permission checks are set lookups with no I/O.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._guilds = {}
+        store.add_listener(self.invalidate)
+
+    def invalidate(self, guild_id=None):
+        if guild_id is None:
+            self._guilds.clear()
+        else:
+            self._guilds.pop(str(guild_id), None)
+
+    def _get(self, guild_id):
+        guild_id = str(guild_id)
+        entry = self._guilds.get(guild_id)
+        if entry is None:
+            guild = self._store.get(guild_id)
+            if guild is None:
+                return None
+            entry = self._guilds[guild_id] = _GuildPermissions(guild)
+        return entry
+
+    def is_admin(self, role_ids, guild_id):
+        entry = self._get(guild_id)
+        return entry is not None and not entry.admin_roles.isdisjoint(str(role_id) for role_id in role_ids)
+
+    def is_bot_channel(self, channel_id, guild_id):
+        entry = self._get(guild_id)
+        return entry is not None and str(channel_id) in entry.bot_channels
+
+    def captain_teams(self, role_ids, guild_id):
+        """Return the names of every team one of **role_ids** captains."""
+        entry = self._get(guild_id)
+        teams = set()
+        if entry is not None:
+            for role_id in role_ids:
+                teams |= entry.captain_roles.get(str(role_id), set())
+        return teams
+
+    def is_team_captain(self, role_ids, guild_id, team_name):
+        return team_name in self.captain_teams(role_ids, guild_id)
+
+permission_index = PermissionIndex(server_store)
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import tempfile
+
+def atomic_write(filename, text):
+    """Replace **filename** with **text** without ever leaving a half-written file.
+
+    The text is written to a temporary file in the same folder, flushed and
+    fsynced, then renamed over the target.
+
+    Args:
+        filename (path): The file to replace.
+        text (str | bytes): The full new contents.
+    """
+    folder = os.path.dirname(filename) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(text, bytes) else 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class WriteBehind:
+    """Coalesce bursts of saves into a single delayed background flush.
+
+    **flush** is an async callable that writes whatever is dirty and returns
+    True if more work arrived while it was running.
+    """
+
+    def __init__(self, flush, delay=0.25):
+        self._flush = flush
+        self.delay = delay
+        self._task = None
+
+    def schedule(self):
+        """Arrange for a flush **delay** seconds from now.
+
+        Returns:
+            bool: False when there is no running event loop, in which case the
+            caller has to flush synchronously.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        return True
+
+    async def _run(self):
+        more = True
+        while more:
+            await asyncio.sleep(self.delay)
+            try:
+                more = await self._flush()
+            except Exception as e:
+                print(f"Background save failed, retrying: {e}")
+                more = True
@@ -0,0 +1,125 @@
+import asyncio
+import heapq
+import itertools
+from datetime import datetime, timedelta, timezone
+
+# Reminder key -> how long before the event it goes out
+REMINDER_OFFSETS = {
+    "24h": timedelta(hours=24),
+    "1h": timedelta(hours=1)
+}
+MAX_SLEEP = 3600
+
+def minute_start(dt):
+    return dt.replace(second=0, microsecond=0)
+
+def reminder_needed(state, key):
+    """Whether reminder **key** is still due for an event.
+
+    A reminder is no longer needed once it, or any later one, has been sent.
+    """
+    offset = REMINDER_OFFSETS[key]
+    return not any(
+        REMINDER_OFFSETS.get(sent) is not None and REMINDER_OFFSETS[sent] <= offset
+        for sent in state.get("reminders_sent", [])
+    )
+
+class ReminderScheduler:
+    """Min-heap of every upcoming event reminder across all guilds.
+
+    **plan(state)** pushes the reminders an event still needs; **run** sleeps
+    until the minute the earliest one is due and hands everything due in that
+    minute to **callback(due)** as one list of ``(state, key)`` pairs, so the
+    caller can batch reminders per channel. An event is only planned again
+    when its start time changes; entries from an older plan, or for an event
+    that was **forget**-ten, are skipped when they surface rather than dug out
+    of the heap. Entries are also checked again by the caller when they fire.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._heap = []
+        self._planned = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._tasks = set()
+
+    def plan(self, state, now=None):
+        """Queue the reminders an event hasn't had yet.
+
+        Reminders already missed (e.g. while the bot was offline) are not
+        replayed one by one: only the latest missed one is sent, straight
+        away, and only if the event hasn't started. Reminders that were due
+        before the event was even created are skipped.
+        """
+        start = state.start
+        now = now or datetime.now(timezone.utc)
+        if start is None or start <= now:
+            return
+        event_key = (state.guild_id, state.message_id)
+        planned = self._planned.get(event_key)
+        if planned is not None and planned[0] is state and planned[1] == start:
+            # Already queued; e.g. a reminder being marked as sent changes nothing here
+            return
+        self._planned[event_key] = (state, start)
+        created = state.get("created_at")
+        created = datetime.fromisoformat(created) if created else None
+        missed = None
+        for key, offset in REMINDER_OFFSETS.items():
+            if not reminder_needed(state, key):
+                continue
+            fire_at = start - offset
+            if fire_at > now:
+                heapq.heappush(self._heap, (fire_at, next(self._counter), state, key, start))
+            elif created and fire_at < created:
+                # The event was created after this reminder would have gone out
+                continue
+            elif missed is None or fire_at > missed[0]:
+                missed = (fire_at, key)
+        if missed:
+            heapq.heappush(self._heap, (now, next(self._counter), state, missed[1], start))
+        self._wakeup.set()
+
+    def forget(self, state):
+        """Drop an event's plan; its queued reminders are skipped when they surface."""
+        self._planned.pop((state.guild_id, state.message_id), None)
+
+    def plan_all(self, states):
+        now = datetime.now(timezone.utc)
+        for state in states:
+            self.plan(state, now)
+
+    async def run(self):
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            # Everything due in the same minute goes out together
+            delay = (minute_start(self._heap[0][0]) - datetime.now(timezone.utc)).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            minute_end = minute_start(datetime.now(timezone.utc)) + timedelta(minutes=1)
+            due = []
+            while self._heap and self._heap[0][0] < minute_end:
+                _, _, state, key, start = heapq.heappop(self._heap)
+                planned = self._planned.get((state.guild_id, state.message_id))
+                if planned is None or planned[0] is not state or planned[1] != start:
+                    continue
+                due.append((state, key))
+            if due:
+                task = asyncio.create_task(self._run_batch(due))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, due):
+        try:
+            await self.callback(due)
+        except Exception as e:
+            print(f"Reminder batch of {len(due)} failed: {e}")
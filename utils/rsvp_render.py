@@ -0,0 +1,90 @@
+from itertools import islice
+from utils.storage import RSVP_KEYS
+
+FIELD_LIMIT = 1024  # Discord's limit for an embed field value
+MORE_ROOM = 16  # Kept free for the "+N more" line
+
+def mention(user_id):
+    return f"<@{user_id}>"
+
+class RosterField:
+    """The rendered value of one RSVP list, kept up to date change by change.
+
+    The field shows the longest prefix of the list (in sign-up order) that
+    fits in an embed field, then "+N more". Sign-ups past the prefix only
+    bump the hidden count, and a removal only refills the prefix from where
+    it ends, so the work per change is bounded by what fits in one field,
+    never by the size of the list.
+    """
+
+    __slots__ = ("visible", "length", "hidden", "_text")
+
+    def __init__(self, members=()):
+        self.visible = {}
+        self.length = 0
+        self.hidden = 0
+        self._text = None
+        for user_id in members:
+            self.add(user_id)
+            if self.hidden:
+                # Everything after the first user that doesn't fit is hidden
+                self.hidden = len(members) - len(self.visible)
+                break
+
+    def _fits(self, text):
+        return self.length + len(text) + 1 <= FIELD_LIMIT - MORE_ROOM
+
+    def add(self, user_id):
+        text = mention(user_id)
+        if not self.hidden and self._fits(text):
+            self.visible[user_id] = text
+            self.length += len(text) + 1
+            self._text = None
+        else:
+            self.hidden += 1
+
+    def remove(self, user_id, members):
+        """Drop a user; **members** is the list's ordered set after the removal."""
+        text = self.visible.pop(user_id, None)
+        if text is None:
+            self.hidden = max(0, self.hidden - 1)
+            return
+        self.length -= len(text) + 1
+        self._text = None
+        # Pull hidden users forward into the freed space, in order
+        for next_user in islice(members, len(self.visible), None):
+            if not self.hidden:
+                break
+            next_text = mention(next_user)
+            if not self._fits(next_text):
+                break
+            self.visible[next_user] = next_text
+            self.length += len(next_text) + 1
+            self.hidden -= 1
+
+    def value(self):
+        if self._text is None:
+            self._text = "\n".join(self.visible.values())
+        if not self._text:
+            return "No one yet"
+        return f"{self._text}\n+{self.hidden} more" if self.hidden else self._text
+
+class RosterRenderer:
+    """Rendered RSVP fields for one event, one **RosterField** per status."""
+
+    __slots__ = ("state", "fields")
+
+    def __init__(self, state):
+        self.state = state
+        self.fields = {key: RosterField(state.members[key]) for key in RSVP_KEYS}
+
+    def apply(self, state, user_id, previous, status):
+        """Reflect one RSVP change already applied to **state**."""
+        # Re-picking the same status still moves the user to the end of the list
+        if previous is not None:
+            self.fields[previous].remove(user_id, state.members[previous])
+        if status is not None:
+            self.fields[status].add(user_id)
+
+    def value(self, key):
+        return self.fields[key].value()
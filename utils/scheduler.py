@@ -0,0 +1,149 @@
+import asyncio
+import heapq
+import itertools
+from datetime import datetime, timedelta, timezone
+import pytz
+from utils.constants import TIMEZONE_MAP
+
+SEND_WEEKDAY = 0  # Monday
+SEND_HOUR = 12
+MAX_SLEEP = 3600  # Re-check the clock at least hourly in case it jumps
+
+def team_timezone(team):
+    """Return the pytz timezone for a team's friendly (or IANA) timezone name."""
+    tz_name = team.get("timezone", "UTC")
+    try:
+        return pytz.timezone(TIMEZONE_MAP.get(tz_name, tz_name))
+    except pytz.UnknownTimeZoneError:
+        return pytz.UTC
+
+def next_fire_time(team, now_utc, weekday=SEND_WEEKDAY, hour=SEND_HOUR):
+    """Return the next weekly send instant for a team, in UTC.
+
+    Args:
+        team (dict): The team config or schedule entry (only its timezone is used).
+        now_utc (datetime): The current time, timezone-aware.
+        weekday (int, optional): Local weekday to send on (Monday is 0).
+        hour (int, optional): Local hour to send at.
+
+    Returns:
+        datetime: The first matching local time strictly after **now_utc**, as UTC.
+    """
+    tz = team_timezone(team)
+    now_local = now_utc.astimezone(tz)
+    days_ahead = (weekday - now_local.weekday()) % 7
+    for week in range(2):
+        day = now_local.date() + timedelta(days=days_ahead + 7 * week)
+        fire_local = tz.localize(datetime(day.year, day.month, day.day, hour))
+        if fire_local > now_local:
+            return fire_local.astimezone(timezone.utc)
+
+def previous_fire_time(team, now_utc, weekday=SEND_WEEKDAY, hour=SEND_HOUR):
+    """Return the most recent weekly send instant at or before **now_utc**, or None."""
+    fire_at = next_fire_time(team, now_utc - timedelta(days=7), weekday, hour)
+    return fire_at if fire_at <= now_utc else None
+
+class WeeklyScheduler:
+    """Min-heap of every team's next weekly send time.
+
+    Teams are planned from their schedule entries (name and timezone, see
+    ``utils.storage.schedule_entry``), so no guild config has to be loaded
+    until its send is due. **run** sleeps until the earliest entry is due
+    instead of polling. When a guild's teams or timezones change,
+    **plan_guild** re-plans just that guild; its older heap entries are
+    recognised as stale by a per-guild version number and skipped when they
+    surface.
+
+    Everything due at the same moment is handed over as one batch:
+    **callback(due)** runs as a background task with a list of
+    ``(guild_id, entry)`` pairs, so a slow batch never delays the next wake-up.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._heap = []
+        self._versions = {}
+        self._planned = {}
+        self._live = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._tasks = set()
+
+    def plan_guild(self, guild_id, entries):
+        """(Re-)plan every team in one guild.
+
+        Nothing happens unless the guild's team names or timezones changed.
+        Sends that are already due but not yet run are carried over to the
+        new plan rather than dropped.
+
+        Args:
+            guild_id (int | str): The guild/server ID.
+            entries (list[dict]): The guild's schedule entries.
+        """
+        guild_id = str(guild_id)
+        if self._planned.get(guild_id, []) == entries:
+            return
+        old_version = self._versions.get(guild_id)
+        version = (old_version or 0) + 1
+        self._versions[guild_id] = version
+        self._planned[guild_id] = [dict(entry) for entry in entries]
+
+        now = datetime.now(timezone.utc)
+        by_name = {entry["team_name"]: entry for entry in self._planned[guild_id]}
+        carried = set()
+        for fire_at, _, entry_guild, entry_version, entry in list(self._heap):
+            if entry_guild == guild_id and entry_version == old_version and fire_at <= now and entry["team_name"] in by_name:
+                # Its next week is planned when it runs
+                heapq.heappush(self._heap, (fire_at, next(self._counter), guild_id, version, by_name[entry["team_name"]]))
+                carried.add(entry["team_name"])
+        for entry in self._planned[guild_id]:
+            if entry["team_name"] not in carried:
+                heapq.heappush(self._heap, (next_fire_time(entry, now), next(self._counter), guild_id, version, entry))
+        self._live[guild_id] = len(entries)
+        self._compact()
+        self._wakeup.set()
+
+    def plan_all(self, schedules):
+        for guild_id, entries in schedules.items():
+            self.plan_guild(guild_id, entries)
+
+    def _compact(self):
+        # Drop stale entries once they outnumber live ones
+        if len(self._heap) > 2 * sum(self._live.values()) + 64:
+            self._heap = [entry for entry in self._heap if self._versions.get(entry[2]) == entry[3]]
+            heapq.heapify(self._heap)
+
+    async def run(self):
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = datetime.now(timezone.utc)
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, _, guild_id, version, entry = heapq.heappop(self._heap)
+                if self._versions.get(guild_id) != version:
+                    continue
+                # Plan next week's send before running this one
+                heapq.heappush(self._heap, (next_fire_time(entry, fire_at), next(self._counter), guild_id, version, entry))
+                due.append((guild_id, entry))
+            if due:
+                task = asyncio.create_task(self._run_batch(due))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, due):
+        try:
+            await self.callback(due)
+        except Exception as e:
+            print(f"Scheduled batch of {len(due)} send(s) failed: {e}")
@@ -0,0 +1,179 @@
+import asyncio
+import json
+from utils.persist import WriteBehind
+from utils.storage import get_server_backend, schedule_entry
+
+class ServerStore:
+    """Process-wide, in-memory cache of the server configuration.
+
+    Only the list of known guild IDs is read up front; each guild's config is
+    loaded from the storage backend (per-guild JSON files or SQLite) the first
+    time it is touched and served from memory after that. Mutations are marked
+    dirty with **save** and written behind: a burst of saves becomes one write
+    of just the changed guilds, done in a worker thread a few hundred
+    milliseconds later.
+    """
+
+    def __init__(self, backend=None, delay=0.25):
+        self._backend = backend
+        self._ids = None
+        self._guilds = {}
+        self._dirty = set()
+        self._deleted = set()
+        self._listeners = []
+        self._flush_lock = asyncio.Lock()
+        self._writer = WriteBehind(self.flush, delay=delay)
+
+    def _ensure(self):
+        if self._ids is None:
+            if self._backend is None:
+                self._backend = get_server_backend()
+            self._ids = dict.fromkeys(self._backend.guild_ids())
+            self._guilds = {}
+            self._dirty = set()
+            self._deleted = set()
+        return self._ids
+
+    def add_listener(self, callback):
+        """Register **callback(guild_id)** to run whenever a guild's config changes.
+
+        Derived in-memory indexes use this to invalidate themselves. The guild ID
+        is None when every guild may have changed.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, guild_id):
+        for callback in self._listeners:
+            callback(guild_id)
+
+    def guild_ids(self):
+        """Return the IDs of every known guild without loading their configs."""
+        return list(self._ensure())
+
+    def all(self):
+        """Return every guild's configuration, keyed by guild ID.
+
+        This loads every guild, so prefer **get** when only one is needed.
+
+        Returns:
+            dict: The live guild configs. Call **save** after mutating one.
+        """
+        return {guild_id: self.get(guild_id) for guild_id in self.guild_ids()}
+
+    def schedule_entries(self):
+        """Return each guild's team names and timezones without loading any guild.
+
+        Guilds already in memory are read directly so unsaved changes count.
+
+        Returns:
+            dict[str, list[dict]]: ``{guild_id: [{"team_name", "timezone"}, ...]}``.
+        """
+        ids = self._ensure()
+        entries = self._backend.schedule_entries()
+        for guild_id, guild in self._guilds.items():
+            entries[guild_id] = schedule_entry(guild)
+        return {guild_id: teams for guild_id, teams in entries.items() if teams and guild_id in ids}
+
+    def schedule_entry(self, guild_id):
+        """Return one guild's team names and timezones, loading it if needed."""
+        return schedule_entry(self.get(guild_id))
+
+    def get(self, guild_id, default=None):
+        """Return the configuration for a single guild.
+
+        Args:
+            guild_id (int | str): The guild/server ID.
+            default (any, optional): Returned when the guild is unknown.
+
+        Returns:
+            dict: The live guild configuration, or **default**.
+        """
+        guild_id = str(guild_id)
+        guild = self._guilds.get(guild_id)
+        if guild is None and guild_id in self._ensure():
+            guild = self._backend.load_guild(guild_id)
+            if guild is None:
+                guild = {}
+            self._guilds[guild_id] = guild
+        return guild if guild is not None else default
+
+    def __contains__(self, guild_id):
+        return str(guild_id) in self._ensure()
+
+    def set(self, guild_id, guild_data):
+        """Replace a guild's configuration and persist it."""
+        guild_id = str(guild_id)
+        self._ensure()[guild_id] = None
+        self._guilds[guild_id] = guild_data
+        self._deleted.discard(guild_id)
+        self.save(guild_id)
+
+    def delete(self, guild_id):
+        """Forget a guild's configuration and remove it from the backend."""
+        guild_id = str(guild_id)
+        self._ensure().pop(guild_id, None)
+        self._guilds.pop(guild_id, None)
+        self._deleted.add(guild_id)
+        self.save(guild_id)
+
+    def save(self, guild_id):
+        """Mark a guild's configuration as changed and schedule a write.
+
+        Args:
+            guild_id (int | str): The guild that changed.
+        """
+        self._dirty.add(str(guild_id))
+        self._notify(str(guild_id))
+        if not self._writer.schedule():
+            self.flush_sync()
+
+    def _snapshot(self):
+        """Encode the dirty guilds and return them with the current guild order.
+
+        Only explicit deletes are encoded as None. A guild saved without ever
+        being loaded can't have changed, so it is skipped.
+
+        Returns:
+            tuple[dict, list, dict]: The encoded changes, the guild order and
+            each changed guild's schedule entry.
+        """
+        changes, schedules = {}, {}
+        for guild_id in self._dirty:
+            if guild_id in self._deleted:
+                changes[guild_id] = None
+                schedules[guild_id] = []
+            elif guild_id in self._guilds:
+                changes[guild_id] = json.dumps(self._guilds[guild_id], indent=4)
+                schedules[guild_id] = schedule_entry(self._guilds[guild_id])
+        self._dirty.clear()
+        self._deleted.clear()
+        return changes, list(self._ids), schedules
+
+    async def flush(self):
+        """Write pending changes now, off the event loop.
+
+        Returns:
+            bool: True if further changes arrived while writing.
+        """
+        async with self._flush_lock:
+            if self._ids is None or not self._dirty:
+                return False
+            changed = set(self._dirty)
+            deleted = set(self._deleted)
+            snapshot = self._snapshot()
+            try:
+                await asyncio.to_thread(self._backend.write, *snapshot)
+            except Exception:
+                self._dirty |= changed
+                # A guild re-created since the snapshot must not be deleted on retry
+                self._deleted |= {guild_id for guild_id in deleted if guild_id not in self._ids}
+                raise
+            return bool(self._dirty)
+
+    def flush_sync(self):
+        """Write pending changes immediately on the calling thread (shutdown)."""
+        if self._ids is None or not self._dirty:
+            return
+        self._backend.write(*self._snapshot())
+
+server_store = ServerStore()
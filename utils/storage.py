@@ -0,0 +1,643 @@
+import gzip
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from utils.constants import STORAGE_BACKEND, SQLITE_PATH
+from utils.persist import atomic_write
+
+SERVERS_FILE = "data/servers.json"
+GUILDS_FOLDER = "data/guilds"
+EVENTS_FOLDER = "data/events"
+ARCHIVE_FOLDER = "data/events/archive"
+ARCHIVE_MONTH = re.compile(r"\d{4}-\d{2}")
+
+# ---------- JSON ----------
+
+class JSONServerBackend:
+    """Legacy layout: every guild's configuration in a single servers.json.
+
+    Only read, to migrate existing installs to the sharded layout.
+    """
+
+    def __init__(self, filename=SERVERS_FILE):
+        self.filename = filename
+
+    def load_all(self):
+        if not os.path.exists(self.filename):
+            return {}
+        with open(self.filename, 'r') as f:
+            return json.load(f)
+
+def schedule_entry(guild):
+    """Return what the weekly scheduler needs from a guild: each team's name and timezone."""
+    if not guild or not guild.get("SetupComplete", False):
+        return []
+    return [
+        {"team_name": team.get("team_name", ""), "timezone": team.get("timezone", "UTC")}
+        for team in guild.get("teams", [])
+    ]
+
+class ShardedJSONServerBackend:
+    """Guild configuration sharded into one ``data/guilds/<guild_id>.json`` per guild.
+
+    A small manifest lists the known guild IDs so guilds can be loaded lazily,
+    and a change to one guild only rewrites that guild's file. Each guild's
+    **schedule_entry** is kept in its own small
+    ``data/guilds/schedules/<guild_id>.json``, rewritten only when that
+    guild's team names or timezones change, so the weekly scheduler can plan
+    every team at startup without loading any guild config.
+    """
+
+    def __init__(self, folder=GUILDS_FOLDER, legacy_file=SERVERS_FILE):
+        self.folder = folder
+        self.manifest_file = os.path.join(folder, "manifest.json")
+        self.schedules_folder = os.path.join(folder, "schedules")
+        self.legacy_file = legacy_file
+        self._manifest = None
+        self._schedules = None
+        self._manifest_schedules = None
+        os.makedirs(self.folder, exist_ok=True)
+
+    def get_guild_file(self, guild_id):
+        return os.path.join(self.folder, f"{guild_id}.json")
+
+    def get_schedule_file(self, guild_id):
+        return os.path.join(self.schedules_folder, f"{guild_id}.json")
+
+    def guild_ids(self):
+        if self._manifest is None:
+            if not os.path.exists(self.manifest_file) and os.path.exists(self.legacy_file):
+                MigrateServersToShards(self.legacy_file, self)
+            if os.path.exists(self.manifest_file):
+                with open(self.manifest_file, 'r') as f:
+                    manifest = json.load(f)
+                self._manifest = manifest["guilds"]
+                # Schedules used to live in the manifest; moved out on first use
+                self._manifest_schedules = manifest.get("schedules")
+            else:
+                self._manifest = []
+        return list(self._manifest)
+
+    def schedule_entries(self):
+        """Return ``{guild_id: schedule_entry}`` for every guild with teams to schedule."""
+        self.guild_ids()
+        if self._schedules is None:
+            self._schedules = self._read_schedules()
+        if self._schedules is None:
+            # Built once from the old manifest, or from the guild files before that
+            schedules = self._manifest_schedules
+            if schedules is None:
+                schedules = {guild_id: schedule_entry(guild) for guild_id, guild in self.load_all().items()}
+            self._schedules = {}
+            os.makedirs(self.schedules_folder, exist_ok=True)
+            self._write_schedules(schedules)
+            if self._manifest_schedules is not None:
+                self._manifest_schedules = None
+                self._write_manifest(self._manifest)
+        return {guild_id: entries for guild_id, entries in self._schedules.items() if entries}
+
+    def _read_schedules(self):
+        if not os.path.isdir(self.schedules_folder):
+            return None
+        schedules = {}
+        for name in os.listdir(self.schedules_folder):
+            if name.endswith(".json"):
+                with open(os.path.join(self.schedules_folder, name), 'r') as f:
+                    schedules[name[:-len(".json")]] = json.load(f)
+        return schedules
+
+    def _write_schedules(self, schedules):
+        for guild_id, entries in schedules.items():
+            entries = entries or []
+            if self._schedules.get(guild_id, []) == entries:
+                continue
+            file_path = self.get_schedule_file(guild_id)
+            if entries:
+                self._schedules[guild_id] = entries
+                atomic_write(file_path, json.dumps(entries, separators=(",", ":")))
+            else:
+                self._schedules.pop(guild_id, None)
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+    def _write_manifest(self, order):
+        atomic_write(self.manifest_file, json.dumps({"guilds": order}, separators=(",", ":")))
+        self._manifest = list(order)
+
+    def load_guild(self, guild_id):
+        file_path = self.get_guild_file(guild_id)
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, 'r') as f:
+            return json.load(f)
+
+    def load_all(self):
+        return {guild_id: self.load_guild(guild_id) or {} for guild_id in self.guild_ids()}
+
+    def write(self, changes, order, schedules=None):
+        """Persist changed guilds.
+
+        Args:
+            changes (dict[str, str | None]): Encoded guild config per changed guild ID, None if deleted.
+            order (list[str]): Every guild ID currently in the store, in order.
+            schedules (dict[str, list], optional): The **schedule_entry** of each changed guild.
+        """
+        for guild_id, encoded in changes.items():
+            if encoded is None:
+                file_path = self.get_guild_file(guild_id)
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            else:
+                atomic_write(self.get_guild_file(guild_id), encoded)
+
+        if self._schedules is None:
+            # Builds the schedule index first if there isn't one yet
+            self.schedule_entries()
+        self._write_schedules({guild_id: (schedules or {}).get(guild_id) for guild_id in changes})
+        if order != self._manifest:
+            self._write_manifest(order)
+
+def MigrateServersToShards(legacy_file=SERVERS_FILE, backend=None):
+    """Split a monolithic servers.json into per-guild files plus a manifest.
+
+    The original file is kept as ``servers.json.bak``.
+
+    Args:
+        legacy_file (path, optional): The servers.json to split.
+        backend (ShardedJSONServerBackend, optional): Where to write the shards.
+
+    Returns:
+        int: The number of guilds migrated.
+    """
+    backend = backend or ShardedJSONServerBackend(legacy_file=legacy_file)
+    servers = JSONServerBackend(legacy_file).load_all()
+    backend._manifest = None
+    backend._schedules = {}
+    os.makedirs(backend.schedules_folder, exist_ok=True)
+    backend.write(
+        {guild_id: json.dumps(guild, indent=4) for guild_id, guild in servers.items()},
+        list(servers),
+        {guild_id: schedule_entry(guild) for guild_id, guild in servers.items()}
+    )
+    os.replace(legacy_file, legacy_file + ".bak")
+    print(f"Migrated {len(servers)} guild(s) from {legacy_file} to {backend.folder}")
+    return len(servers)
+
+RSVP_KEYS = ["attend", "maybe", "cant"]
+
+def apply_rsvp(event_data, user_id, status):
+    """Move a user into one RSVP list of an event, or out of all of them.
+
+    Args:
+        event_data (dict): The event to update in place.
+        user_id (int): The user RSVPing.
+        status (str | None): One of **RSVP_KEYS**, or None to remove the user.
+
+    Returns:
+        str | None: The list the user was in before, if any.
+    """
+    previous = None
+    for key in RSVP_KEYS:
+        members = event_data.setdefault(key, [])
+        if user_id in members:
+            members.remove(user_id)
+            previous = key
+    if status is not None:
+        event_data[status].append(user_id)
+    return previous
+
+def event_start(event_data):
+    """Return an event's start as an aware datetime, or None if it has none."""
+    try:
+        start = datetime.fromisoformat(event_data["datetime"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+
+def split_past_events(events, before):
+    """Split ``{message_id: event_data}`` into ``{month: {message_id: event_data}}`` of events starting before **before**."""
+    by_month = {}
+    for message_id, event_data in events.items():
+        start = event_start(event_data)
+        if start and start < before:
+            by_month.setdefault(start.strftime("%Y-%m"), {})[str(message_id)] = event_data
+    return by_month
+
+def is_archive_month(month):
+    """Return True if **month** is a ``YYYY-MM`` archive month."""
+    return isinstance(month, str) and ARCHIVE_MONTH.fullmatch(month) is not None
+
+class EventArchive:
+    """Past events in gzipped JSON, one file per guild and month.
+
+    ``data/events/archive/<guild_id>/<YYYY-MM>.json.gz`` holds
+    ``{message_id: event_data}`` for events that started in that month.
+    Writes merge into the existing file, so archiving the same event twice
+    (e.g. after a crash between writing the archive and the hot file) is
+    harmless.
+    """
+
+    def __init__(self, folder=ARCHIVE_FOLDER):
+        self.folder = folder
+
+    def get_month_file(self, guild_id, month):
+        # Both parts become a path, so only a snowflake and a YYYY-MM month are allowed
+        if not str(guild_id).isdigit() or not is_archive_month(month):
+            raise ValueError(f"Invalid archive month {month!r} for guild {guild_id!r}")
+        return os.path.join(self.folder, str(guild_id), f"{month}.json.gz")
+
+    def months(self, guild_id):
+        """Return the archived months for a guild, oldest first."""
+        folder = os.path.join(self.folder, str(guild_id))
+        if not os.path.isdir(folder):
+            return []
+        months = (name[:-len(".json.gz")] for name in os.listdir(folder) if name.endswith(".json.gz"))
+        return sorted(month for month in months if is_archive_month(month))
+
+    def load_month(self, guild_id, month):
+        file_path = self.get_month_file(guild_id, month)
+        if not os.path.exists(file_path):
+            return {}
+        with gzip.open(file_path, 'rt') as f:
+            return json.load(f)
+
+    def write_month(self, guild_id, month, events):
+        file_path = self.get_month_file(guild_id, month)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        merged = self.load_month(guild_id, month)
+        merged.update(events)
+        data = gzip.compress(json.dumps(merged).encode())
+        atomic_write(file_path, data)
+
+    def store(self, guild_id, by_month):
+        for month, events in by_month.items():
+            self.write_month(guild_id, month, events)
+
+class JSONEventBackend:
+    """Events kept in one ``data/events/<guild_id>.json`` document per guild.
+
+    RSVP clicks are not written to that snapshot directly. Each one is appended
+    as a line to ``data/events/<guild_id>.journal`` and the journal is folded
+    back into the snapshot every **compact_after** lines (and periodically via
+    **compact_all**). Loading a guild replays its journal over the snapshot.
+    """
+
+    def __init__(self, folder=EVENTS_FOLDER, compact_after=500):
+        self.folder = folder
+        self.compact_after = compact_after
+        self._events = {}
+        self._journal_lines = {}
+        os.makedirs(self.folder, exist_ok=True)
+
+    def get_events_file(self, guild_id):
+        return os.path.join(self.folder, f"{guild_id}.json")
+
+    def get_journal_file(self, guild_id):
+        return os.path.join(self.folder, f"{guild_id}.journal")
+
+    def load_events(self, guild_id):
+        guild_id = str(guild_id)
+        if guild_id not in self._events:
+            events = {}
+            file_path = self.get_events_file(guild_id)
+            if os.path.exists(file_path):
+                with open(file_path, 'r') as f:
+                    events = json.load(f)
+            self._events[guild_id] = events
+            count, torn = self._replay_journal(guild_id, events)
+            self._journal_lines[guild_id] = count
+            if torn:
+                # Fold the journal away now so new appends don't land on the torn line
+                self.save_events(guild_id, events)
+        return self._events[guild_id]
+
+    def _replay_journal(self, guild_id, events):
+        journal_path = self.get_journal_file(guild_id)
+        if not os.path.exists(journal_path):
+            return 0, False
+        count = 0
+        with open(journal_path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-append
+                    return count, True
+                count += 1
+                # Lines for an event archived since are left out rather than bringing it back
+                if entry["message_id"] in events:
+                    apply_rsvp(events[entry["message_id"]], entry["user_id"], entry["status"])
+        return count, False
+
+    def load_event(self, guild_id, message_id):
+        return self.load_events(guild_id).get(str(message_id))
+
+    def save_events(self, guild_id, events):
+        guild_id = str(guild_id)
+        self._events[guild_id] = events
+        atomic_write(self.get_events_file(guild_id), json.dumps(events, indent=4))
+        # The snapshot now includes everything the journal recorded
+        journal_path = self.get_journal_file(guild_id)
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+        self._journal_lines[guild_id] = 0
+
+    def save_event(self, guild_id, message_id, event_data):
+        events = self.load_events(guild_id)
+        events[str(message_id)] = event_data
+        self.save_events(guild_id, events)
+
+    def record_rsvp(self, guild_id, message_id, user_id, status):
+        """Apply one RSVP change and append it to the guild's journal.
+
+        Args:
+            guild_id (int | str): The guild the event belongs to.
+            message_id (int | str): The event message.
+            user_id (int): The user RSVPing.
+            status (str | None): One of **RSVP_KEYS**, or None to remove the user.
+
+        Returns:
+            tuple[dict, str | None]: The updated event and the user's previous status,
+            or ``(None, None)`` if the event no longer exists (the RSVP is dropped).
+        """
+        guild_id = str(guild_id)
+        events = self.load_events(guild_id)
+        event_data = events.get(str(message_id))
+        if event_data is None:
+            print(f"Dropped RSVP by {user_id} for event {message_id} in guild {guild_id}: the event no longer exists")
+            return None, None
+        previous = apply_rsvp(event_data, user_id, status)
+        entry = {"message_id": str(message_id), "user_id": user_id, "status": status}
+        with open(self.get_journal_file(guild_id), 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+        self._journal_lines[guild_id] += 1
+        if self._journal_lines[guild_id] >= self.compact_after:
+            self.compact(guild_id)
+        return event_data, previous
+
+    def event_guild_ids(self):
+        """Return every guild that has an events file or journal."""
+        names = os.listdir(self.folder)
+        return sorted({os.path.splitext(name)[0] for name in names if name.endswith((".json", ".journal"))})
+
+    def iter_events(self, since):
+        """Yield ``(guild_id, message_id, event_data)`` for events starting at or after **since**."""
+        for guild_id in self.event_guild_ids():
+            for message_id, event_data in self.load_events(guild_id).items():
+                start = event_start(event_data)
+                if start and start >= since:
+                    yield guild_id, message_id, event_data
+
+    def archive_events(self, guild_id, before, archive):
+        """Move a guild's events that started before **before** into **archive**.
+
+        Returns:
+            list[str]: The message IDs that were moved.
+        """
+        events = self.load_events(guild_id)
+        by_month = split_past_events(events, before)
+        if not by_month:
+            return []
+        # Archive first: a crash in between leaves a duplicate, never a loss
+        archive.store(guild_id, by_month)
+        moved = [message_id for month_events in by_month.values() for message_id in month_events]
+        for message_id in moved:
+            del events[message_id]
+        self.save_events(guild_id, events)
+        return moved
+
+    def compact(self, guild_id):
+        """Fold a guild's journal into its snapshot file."""
+        guild_id = str(guild_id)
+        if self._journal_lines.get(guild_id):
+            self.save_events(guild_id, self._events[guild_id])
+
+    def compact_all(self):
+        for guild_id in list(self._journal_lines):
+            self.compact(guild_id)
+
+# ---------- SQLITE ----------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guilds (
+    guild_id TEXT PRIMARY KEY,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS teams (
+    guild_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    team_name TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (guild_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_teams_name ON teams (guild_id, team_name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS events (
+    guild_id TEXT NOT NULL,
+    message_id TEXT NOT NULL,
+    team_name TEXT,
+    datetime TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (guild_id, message_id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_datetime ON events (datetime);
+CREATE INDEX IF NOT EXISTS idx_events_guild_datetime ON events (guild_id, datetime);
+"""
+
+class SQLiteBackend:
+    """Guilds, teams and events as indexed rows in a WAL-mode SQLite database.
+
+    A guild's teams live in their own table so a config change rewrites one
+    guild's rows, and each event is a single row keyed by its message ID.
+    """
+
+    def __init__(self, db_path=SQLITE_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Guild configuration
+
+    def guild_ids(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT guild_id FROM guilds ORDER BY rowid").fetchall()
+        return [guild_id for guild_id, in rows]
+
+    def load_guild(self, guild_id):
+        with self._lock:
+            row = self._conn.execute("SELECT config FROM guilds WHERE guild_id = ?", (guild_id,)).fetchone()
+            team_rows = self._conn.execute(
+                "SELECT data FROM teams WHERE guild_id = ? ORDER BY position", (guild_id,)
+            ).fetchall()
+        if row is None:
+            return None
+        guild = json.loads(row[0])
+        for team, in team_rows:
+            guild.setdefault("teams", []).append(json.loads(team))
+        return guild
+
+    def load_all(self):
+        with self._lock:
+            guild_rows = self._conn.execute("SELECT guild_id, config FROM guilds ORDER BY rowid").fetchall()
+            team_rows = self._conn.execute("SELECT guild_id, data FROM teams ORDER BY guild_id, position").fetchall()
+        data = {guild_id: json.loads(config) for guild_id, config in guild_rows}
+        for guild_id, team in team_rows:
+            if guild_id in data:
+                data[guild_id].setdefault("teams", []).append(json.loads(team))
+        return data
+
+    def schedule_entries(self):
+        """Return ``{guild_id: schedule_entry}`` for every guild with teams to schedule."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT t.guild_id, t.team_name, json_extract(t.data, '$.timezone') FROM teams t "
+                "JOIN guilds g ON g.guild_id = t.guild_id "
+                "WHERE json_extract(g.config, '$.SetupComplete') ORDER BY t.guild_id, t.position"
+            ).fetchall()
+        entries = {}
+        for guild_id, team_name, tz_name in rows:
+            entries.setdefault(guild_id, []).append({"team_name": team_name, "timezone": tz_name or "UTC"})
+        return entries
+
+    def _write_guild(self, guild_id, guild):
+        guild = dict(guild)
+        teams = guild.get("teams")
+        if teams is not None:
+            guild["teams"] = []
+        self._conn.execute(
+            "INSERT INTO guilds (guild_id, config) VALUES (?, ?) "
+            "ON CONFLICT(guild_id) DO UPDATE SET config = excluded.config",
+            (guild_id, json.dumps(guild))
+        )
+        self._conn.execute("DELETE FROM teams WHERE guild_id = ?", (guild_id,))
+        if teams is not None:
+            self._conn.executemany(
+                "INSERT INTO teams (guild_id, position, team_name, data) VALUES (?, ?, ?, ?)",
+                [(guild_id, idx, team.get("team_name", ""), json.dumps(team)) for idx, team in enumerate(teams)]
+            )
+
+    def write(self, changes, order=None, schedules=None):
+        with self._lock, self._conn:
+            for guild_id, encoded in changes.items():
+                if encoded is None:
+                    self._conn.execute("DELETE FROM guilds WHERE guild_id = ?", (guild_id,))
+                    self._conn.execute("DELETE FROM teams WHERE guild_id = ?", (guild_id,))
+                else:
+                    self._write_guild(guild_id, json.loads(encoded))
+
+    # Events
+
+    def load_events(self, guild_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT message_id, data FROM events WHERE guild_id = ? ORDER BY rowid", (str(guild_id),)
+            ).fetchall()
+        return {message_id: json.loads(data) for message_id, data in rows}
+
+    def load_event(self, guild_id, message_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM events WHERE guild_id = ? AND message_id = ?", (str(guild_id), str(message_id))
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_event(self, guild_id, message_id, event_data):
+        self.save_events(guild_id, {message_id: event_data})
+
+    def record_rsvp(self, guild_id, message_id, user_id, status):
+        event_data = self.load_event(guild_id, message_id)
+        if event_data is None:
+            # Archived (or gone) while the RSVP was queued; don't bring it back as a stub
+            print(f"Dropped RSVP by {user_id} for event {message_id} in guild {guild_id}: the event no longer exists")
+            return None, None
+        previous = apply_rsvp(event_data, user_id, status)
+        self.save_event(guild_id, message_id, event_data)
+        return event_data, previous
+
+    def iter_events(self, since):
+        """Yield ``(guild_id, message_id, event_data)`` for events starting at or after **since**."""
+        # Stored times carry their team's UTC offset, so the indexed string
+        # comparison is only approximate; a day of slack covers any offset
+        cutoff = (since - timedelta(days=1)).astimezone(timezone.utc).isoformat()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT guild_id, message_id, data FROM events WHERE datetime >= ? ORDER BY datetime", (cutoff,)
+            ).fetchall()
+        for guild_id, message_id, data in rows:
+            event_data = json.loads(data)
+            start = event_start(event_data)
+            if start and start >= since:
+                yield guild_id, message_id, event_data
+
+    def event_guild_ids(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT guild_id FROM events").fetchall()
+        return [guild_id for guild_id, in rows]
+
+    def archive_events(self, guild_id, before, archive):
+        """Move a guild's events that started before **before** into **archive**.
+
+        Returns:
+            list[str]: The message IDs that were moved.
+        """
+        by_month = split_past_events(self.load_events(guild_id), before)
+        if not by_month:
+            return []
+        archive.store(guild_id, by_month)
+        moved = [message_id for month_events in by_month.values() for message_id in month_events]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM events WHERE guild_id = ? AND message_id = ?",
+                [(str(guild_id), message_id) for message_id in moved]
+            )
+        return moved
+
+    def compact_all(self):
+        # Every change is already a single-row update
+        pass
+
+    def save_events(self, guild_id, events):
+        rows = [
+            (str(guild_id), str(message_id), event_data.get("team_name"), event_data.get("datetime"), json.dumps(event_data))
+            for message_id, event_data in events.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO events (guild_id, message_id, team_name, datetime, data) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(guild_id, message_id) DO UPDATE SET "
+                "team_name = excluded.team_name, datetime = excluded.datetime, data = excluded.data",
+                rows
+            )
+
+# ---------- SELECTION ----------
+
+_sqlite = None
+
+def _get_sqlite():
+    global _sqlite
+    if _sqlite is None:
+        _sqlite = SQLiteBackend()
+    return _sqlite
+
+def get_server_backend():
+    """Return the guild configuration backend chosen by ``STORAGE_BACKEND``."""
+    if STORAGE_BACKEND == "sqlite":
+        return _get_sqlite()
+    return ShardedJSONServerBackend()
+
+def get_event_backend():
+    """Return the event backend chosen by ``STORAGE_BACKEND``."""
+    if STORAGE_BACKEND == "sqlite":
+        return _get_sqlite()
+    return JSONEventBackend()
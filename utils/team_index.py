@@ -0,0 +1,95 @@
+from bisect import bisect_left
+from utils.server_store import server_store
+
+MAX_CHOICES = 25  # Discord's limit for autocomplete choices and select options
+
+class _GuildTeams:
+    __slots__ = ("keys", "names", "by_key")
+
+    def __init__(self, teams):
+        entries = sorted(
+            ((team["team_name"].casefold(), team["team_name"], team) for team in teams if team.get("team_name")),
+            key=lambda entry: entry[:2]
+        )
+        self.keys = [key for key, _, _ in entries]
+        self.names = [name for _, name, _ in entries]
+        self.by_key = {}
+        for key, _, team in entries:
+            self.by_key.setdefault(key, team)
+
+    def search(self, query, limit):
+        query = query.casefold().strip()
+        if not query:
+            return self.names[:limit]
+
+        # Exact and prefix matches are a contiguous run in the sorted keys
+        results = []
+        i = bisect_left(self.keys, query)
+        while i < len(self.keys) and len(results) < limit and self.keys[i].startswith(query):
+            results.append(self.names[i])
+            i += 1
+        if len(results) >= limit:
+            return results
+
+        # Then names where a later word starts with the query, then any substring
+        word_matches, other_matches = [], []
+        for key, name in zip(self.keys, self.names):
+            if key.startswith(query):
+                continue
+            pos = key.find(query)
+            if pos == -1:
+                continue
+            if not key[pos - 1].isalnum():
+                word_matches.append(name)
+            else:
+                other_matches.append(name)
+        return (results + word_matches + other_matches)[:limit]
+
+class TeamIndex:
+    """Per-guild, case-folded index of team names.
+
+    Built lazily from the ServerStore and dropped whenever a guild's config is
+    saved, so creating, renaming or deleting a team is picked up on the next
+    lookup.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._guilds = {}
+        store.add_listener(self.invalidate)
+
+    def invalidate(self, guild_id=None):
+        if guild_id is None:
+            self._guilds.clear()
+        else:
+            self._guilds.pop(str(guild_id), None)
+
+    def _get(self, guild_id):
+        guild_id = str(guild_id)
+        entry = self._guilds.get(guild_id)
+        if entry is None:
+            teams = self._store.get(guild_id, {}).get("teams", [])
+            entry = self._guilds[guild_id] = _GuildTeams(teams)
+        return entry
+
+    def search(self, guild_id, query, limit=MAX_CHOICES):
+        """Return team names matching **query**, best matches first.
+
+        Exact and prefix matches come first, then matches at the start of a
+        later word, then any other substring match.
+
+        Args:
+            guild_id (int | str): The guild/server ID.
+            query (str): What the user has typed so far.
+            limit (int, optional): Maximum number of names. Defaults to 25.
+
+        Returns:
+            list[str]: Matching team names.
+        """
+        return self._get(guild_id).search(query, limit)
+
+    def find(self, guild_id, team_name):
+        """Return the live team dict whose name matches case-insensitively, or None."""
+        return self._get(guild_id).by_key.get(team_name.casefold())
+
+team_index = TeamIndex(server_store)